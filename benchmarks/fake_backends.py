@@ -0,0 +1,132 @@
+"""Local stand-ins for prometheus and elastic, answering with generated data after a configurable latency."""
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from typing import Any, Dict, List, Tuple
+
+from aiohttp import web
+
+ELASTIC_HEADERS = {"X-Elastic-Product": "Elasticsearch"}
+
+
+class FakeBackend:
+    def __init__(self, latency_seconds: float = 0.0, payload_bytes: int = 100) -> None:
+        super().__init__()
+        self.latency_seconds = latency_seconds
+        self.payload_bytes = payload_bytes
+        self.requests = 0
+        self.runner: web.AppRunner | None = None
+
+    def get_app(self) -> web.Application:
+        pass
+
+    async def start(self) -> str:
+        """Serve on a free local port, returning the url of the backend."""
+        self.runner = web.AppRunner(self.get_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def respond_later(self) -> None:
+        self.requests += 1
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+
+
+class FakePrometheus(FakeBackend):
+    """Answers instant and range queries with a single series, padded by a label of payload_bytes."""
+
+    def get_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/api/v1/query", self.query)
+        app.router.add_route("*", "/api/v1/query_range", self.query_range)
+        return app
+
+    async def get_params(self, request: web.Request) -> Dict[str, str]:
+        return dict(request.query) if request.method == "GET" else dict(await request.post())
+
+    def get_series(self, query: str) -> Dict[str, Any]:
+        return {"__name__": query.split("{")[0], "padding": "x" * self.payload_bytes}
+
+    async def query(self, request: web.Request) -> web.Response:
+        params = await self.get_params(request)
+        await self.respond_later()
+        result = [{"metric": self.get_series(params["query"]), "value": [time.time(), str(random.random() * 100)]}]
+        return web.json_response({"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    async def query_range(self, request: web.Request) -> web.Response:
+        params = await self.get_params(request)
+        await self.respond_later()
+        start, end, step = float(params["start"]), float(params["end"]), float(params["step"])
+        values = [[start + i * step, str(random.random() * 100)] for i in range(int((end - start) / step) + 1)]
+        result = [{"metric": self.get_series(params["query"]), "values": values}]
+        return web.json_response({"status": "success", "data": {"resultType": "matrix", "result": result}})
+
+
+class FakeElastic(FakeBackend):
+    """Answers searches with the requested number of generated documents, each with a message of payload_bytes."""
+
+    def get_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self.info)
+        app.router.add_route("*", "/_search", self.search)
+        app.router.add_route("*", "/{index}/_search", self.search)
+        app.router.add_route("*", "/_msearch", self.msearch)
+        app.router.add_route("*", "/{index}/_msearch", self.msearch)
+        return app
+
+    async def info(self, request: web.Request) -> web.Response:
+        """The client checks the product of the cluster before its first request."""
+        return web.json_response({"version": {"number": "7.17.0", "build_flavor": "default"},
+                                  "tagline": "You Know, for Search"}, headers=ELASTIC_HEADERS)
+
+    def get_hits(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        now = int(time.time() * 1000)
+        return [{"_index": "logs", "_id": f"{now}-{i}", "sort": [now - i],
+                 "_source": {"@timestamp": now - i, "message": "x" * self.payload_bytes}}
+                for i in range(body.get("size", 10))]
+
+    async def search(self, request: web.Request) -> web.Response:
+        body = await request.json() if request.can_read_body else {}
+        await self.respond_later()
+        return web.json_response({"hits": {"hits": self.get_hits(body)}}, headers=ELASTIC_HEADERS)
+
+    async def msearch(self, request: web.Request) -> web.Response:
+        lines = [json.loads(line) for line in (await request.text()).splitlines() if line.strip()]
+        await self.respond_later()
+        responses = [{"status": 200, "hits": {"hits": self.get_hits(body)}} for body in lines[1::2]]
+        return web.json_response({"responses": responses}, headers=ELASTIC_HEADERS)
+
+
+async def start_backends(latency_seconds: float, payload_bytes: int) -> Tuple[Dict[str, str], List[FakeBackend]]:
+    """Start one fake backend per sensor type, returning their urls by sensor type."""
+    backends = {"prometheus": FakePrometheus(latency_seconds, payload_bytes),
+                "elastic": FakeElastic(latency_seconds, payload_bytes)}
+    urls = {sensor_type: await backend.start() for sensor_type, backend in backends.items()}
+    return urls, list(backends.values())
+
+
+def serve_backends(latency_seconds: float, payload_bytes: int, urls: Any) -> None:
+    async def serve() -> None:
+        started, _ = await start_backends(latency_seconds, payload_bytes)
+        urls.put(started)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def start_backends_process(latency_seconds: float, payload_bytes: int) -> Tuple[Dict[str, str], Any]:
+    """Start the fake backends in a process of their own, so generating large responses does not block the app."""
+    urls = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_backends, args=(latency_seconds, payload_bytes, urls), daemon=True)
+    process.start()
+    return urls.get(), process
@@ -0,0 +1,97 @@
+"""Measure keystroke latency of the app while it polls searches with large responses.
+
+Elastic table sensors poll a fake elastic, running in a process of its own, answering with `--hits` documents with
+a message of `--payload-bytes` each. The tables show the timestamps of `--max-rows` of them, keeping the message as a
+detail field, so the cost of drawing the tables stays small, while keys moving the cursor of the service tree are
+pressed. It is run once decoding every response on the event loop, as all responses were before, and once leaving
+large responses to the worker pool.
+
+    python -m benchmarks.input_latency_benchmark --services 4 --sensors 4 --hits 500 --payload-bytes 2000
+"""
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.fake_backends import start_backends_process
+from benchmarks.load_benchmark import generate_config, percentile, probe_loop_lag
+
+
+async def press_keys(app: Any, pilot: Any, duration: float, interval: float) -> List[float]:
+    from components.service.service_tree import ServiceTree
+
+    app.query_one(ServiceTree).focus()
+    latencies = []
+    end = time.perf_counter() + duration
+    keys = ["down", "up"]
+    while time.perf_counter() < end:
+        start = time.perf_counter()
+        await pilot.press(keys[len(latencies) % 2])
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def measure(offload_bytes: float, args: argparse.Namespace) -> Dict[str, float]:
+    from main import ServiceStatusApp
+    from components.service.service_content import ServiceContent
+    from sensors import worker_pool
+
+    worker_pool.OFFLOAD_BYTES = offload_bytes
+    loop_lags: List[float] = []
+    app = ServiceStatusApp()
+    async with app.run_test(size=(160, 50)) as pilot:
+        content = app.query_one(ServiceContent)
+        for service in app.config.get_services():
+            content.update_selected_service(service)
+        await asyncio.sleep(args.warmup)
+        probe = asyncio.create_task(probe_loop_lag(loop_lags))
+        latencies = await press_keys(app, pilot, args.duration, args.key_interval_ms / 1000)
+        probe.cancel()
+    return {"key_p50_ms": percentile(latencies, 0.5) * 1000, "key_p95_ms": percentile(latencies, 0.95) * 1000,
+            "key_max_ms": max(latencies, default=0.0) * 1000, "loop_lag_p95_ms": percentile(loop_lags, 0.95) * 1000,
+            "loop_lag_max_ms": max(loop_lags, default=0.0) * 1000}
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    urls, backends_process = start_backends_process(args.latency_ms / 1000, args.payload_bytes)
+    config = generate_config(args.services, args.sensors, "elastic", "table", urls, args.poll_wait_seconds, args.hits)
+    for service in config["services"]:
+        for sensor in service["sensors"]:
+            sensor |= {"max_rows": args.max_rows, "result_fields": ["@timestamp"], "detail_fields": ["message"]}
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as config_file:
+        yaml.dump(config, config_file)
+    os.environ["CONFIG_FILE_PATH"] = config_file.name
+    try:
+        return {"event loop": await measure(math.inf, args), "worker pool": await measure(2 ** 16, args)}
+    finally:
+        os.unlink(config_file.name)
+        backends_process.terminate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=4)
+    parser.add_argument("--sensors", type=int, default=4, help="sensors per service")
+    parser.add_argument("--hits", type=int, default=500, help="documents per search")
+    parser.add_argument("--payload-bytes", type=int, default=2000, help="size of every document")
+    parser.add_argument("--max-rows", type=int, default=20, help="rows shown of each search")
+    parser.add_argument("--poll-wait-seconds", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=10, help="latency of every backend response")
+    parser.add_argument("--key-interval-ms", type=float, default=20, help="time between key presses")
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    for mode, summary in results.items():
+        print(f"{mode:>12}: " + ", ".join(f"{key} {value:8.2f}" for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Drive the app headless against local fake backends and report polling and render throughput.
+
+A configuration of N services with M sensors each is generated against a fake prometheus and a fake elastic answering
+after a configurable latency with payloads of a configurable size. The services are selected one after another
+like a user browsing the tree, measurements are taken after a warmup.
+
+    python -m benchmarks.load_benchmark --services 50 --sensors 4 --sensor-type mixed --latency-ms 20 --duration 20
+
+Reported are sensor fetches per second with their latency percentiles, how late the event loop wakes up from a
+sleep, the time to render a full frame, widget update times and the resident memory of the process.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import resource
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.fake_backends import start_backends
+
+FRAME_SECONDS = 1 / 60
+
+
+def generate_config(services: int, sensors: int, sensor_type: str, component_type: str, urls: Dict[str, str],
+                    poll_wait_seconds: int, hits: int) -> Dict[str, Any]:
+    """Every sensor of every service queries something different, so no two sensors share a poll."""
+
+    def generate_sensor(i: int) -> Dict[str, Any]:
+        current_type = sensor_type if sensor_type != "mixed" else ["prometheus", "elastic"][i % 2]
+        sensor = {"sensor_type": current_type, "name": f"{current_type}_{i}", "url": urls[current_type],
+                  "poll_wait_seconds": poll_wait_seconds, "component_type": component_type}
+        if current_type == "prometheus":
+            sensor["metrics"] = [{"name": "value", "query": f'metric_{i}{{instance="$label"}}'}]
+        else:
+            sensor |= {"index_pattern": f"logs-{i}", "max_hits": hits, "sort": {"@timestamp": "desc"},
+                       "query": {"match": {"service": "$label"}}, "result_fields": ["@timestamp", "message"]}
+        return sensor
+
+    return {
+        "title": "Load Benchmark",
+        "services": [{"name": f"service-{i}", "hierarchy": f"group-{i % 10}/", "context": {"label": f"service-{i}"},
+                      "sensors": [generate_sensor(j) for j in range(sensors)]} for i in range(services)],
+    }
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(quantile * len(values)))]
+
+
+def get_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return get_peak_rss_bytes()
+
+
+def get_peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def probe_loop_lag(samples: List[float]) -> None:
+    """Sleep for a frame at a time, any oversleep is time the event loop was blocked by other work."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(FRAME_SECONDS)
+        samples.append(time.perf_counter() - start - FRAME_SECONDS)
+
+
+async def probe_frame_time(app: Any, samples: List[float]) -> None:
+    """Headless apps skip rendering, so a full frame of the current screen is rendered every few ticks."""
+    while True:
+        await asyncio.sleep(0.25)
+        start = time.perf_counter()
+        app.screen._compositor.render_update(full=True).render_segments(app.console)
+        samples.append(time.perf_counter() - start)
+
+
+async def browse_services(content: Any, services: List[Any], select_seconds: float) -> None:
+    for service in itertools.cycle(services):
+        content.update_selected_service(service)
+        await asyncio.sleep(select_seconds)
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    urls, backends = await start_backends(args.latency_ms / 1000, args.payload_bytes)
+    config = generate_config(args.services, args.sensors, args.sensor_type, args.component_type, urls,
+                             args.poll_wait_seconds, args.hits)
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as config_file:
+        yaml.dump(config, config_file)
+    os.environ["CONFIG_FILE_PATH"] = config_file.name
+
+    # the configuration path is read when the app's modules are imported
+    from main import ServiceStatusApp
+    from components.service.service_content import ServiceContent
+    from sensors.metrics import metrics
+
+    loop_lags: List[float] = []
+    frame_times: List[float] = []
+    try:
+        app = ServiceStatusApp()
+        async with app.run_test(size=(160, 50)):
+            services = app.config.get_services()
+            browser = asyncio.create_task(browse_services(app.query_one(ServiceContent), services,
+                                                          args.select_seconds))
+            await asyncio.sleep(args.warmup)
+            metrics.histograms.clear()
+            requests = sum(backend.requests for backend in backends)
+            probes = [asyncio.create_task(probe_loop_lag(loop_lags)),
+                      asyncio.create_task(probe_frame_time(app, frame_times))]
+            await asyncio.sleep(args.duration)
+            requests = sum(backend.requests for backend in backends) - requests
+            rss_bytes = get_rss_bytes()
+            for task in [browser, *probes]:
+                task.cancel()
+    finally:
+        os.unlink(config_file.name)
+        for backend in backends:
+            await backend.stop()
+
+    fetches = metrics.merge("sensor_fetch_seconds")
+    updates = metrics.merge("widget_update_seconds")
+    return {
+        "ticks_per_second": fetches.count / args.duration,
+        "backend_requests_per_second": requests / args.duration,
+        "fetch_p50_ms": fetches.get_quantile(0.5) * 1000,
+        "fetch_p95_ms": fetches.get_quantile(0.95) * 1000,
+        "fetch_p99_ms": fetches.get_quantile(0.99) * 1000,
+        "widget_update_p95_ms": updates.get_quantile(0.95) * 1000,
+        "loop_lag_p50_ms": percentile(loop_lags, 0.5) * 1000,
+        "loop_lag_p99_ms": percentile(loop_lags, 0.99) * 1000,
+        "loop_lag_max_ms": max(loop_lags, default=0.0) * 1000,
+        "frame_median_ms": statistics.median(frame_times) * 1000 if frame_times else 0.0,
+        "frame_p95_ms": percentile(frame_times, 0.95) * 1000,
+        "rss_mb": rss_bytes / 2 ** 20,
+        "peak_rss_mb": max(rss_bytes, get_peak_rss_bytes()) / 2 ** 20,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=50)
+    parser.add_argument("--sensors", type=int, default=4, help="sensors per service")
+    parser.add_argument("--sensor-type", default="mixed", choices=["prometheus", "elastic", "mixed"])
+    parser.add_argument("--component-type", default="table", choices=["table", "sparkline"])
+    parser.add_argument("--poll-wait-seconds", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=10, help="latency of every backend response")
+    parser.add_argument("--payload-bytes", type=int, default=200, help="size of every series label or document")
+    parser.add_argument("--hits", type=int, default=50, help="documents per search")
+    parser.add_argument("--select-seconds", type=float, default=0.5, help="time spent on each service")
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--json", action="store_true", help="print the results as json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, value in results.items():
+        print(f"{name:>28}: {value:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure the latency of every keystroke of a service search for large configurations.
+
+Queries are typed one character at a time, both against the index alone and through the search box of a headless
+app, which also moves the cursor of the service tree to the best match. Typing into a plain input of an otherwise empty
+app is measured as well, it is the overhead of driving the app through its pilot.
+
+    python -m benchmarks.service_search_benchmark --services 10000 --depth 3 --fanout 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from textual.app import App, ComposeResult
+from textual.widgets import Input
+
+from benchmarks.service_tree_benchmark import generate_config
+from components.service.service_index import ServiceIndex
+from components.service.service_search import ServiceSearch
+from components.service.service_tree import ServiceTree
+from config.config import Config, ServiceConfig
+
+
+class SearchApp(App):
+    def __init__(self, service_configs: List[ServiceConfig]) -> None:
+        super().__init__()
+        self.service_configs = service_configs
+
+    def compose(self) -> ComposeResult:
+        if not self.service_configs:
+            yield Input()
+            return
+        yield ServiceSearch(self.service_configs)
+        yield ServiceTree(self.service_configs)
+
+    def on_service_search_matched(self, message: ServiceSearch.Matched) -> None:
+        self.query_one(ServiceTree).show_service(message.service)
+
+
+def get_queries(services: int) -> List[str]:
+    return [f"service-{services - 1}", "group-1-3 service-12", f"service-{services // 2}", "group-2-7"]
+
+
+def type_into_index(index: ServiceIndex, queries: List[str]) -> List[float]:
+    latencies = []
+    for query in queries:
+        for i in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:i])
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def type_into_app(service_configs: List[ServiceConfig], queries: List[str]) -> List[float]:
+    latencies = []
+    app = SearchApp(service_configs)
+    async with app.run_test() as pilot:
+        search = app.query_one(Input)
+        search.focus()
+        for query in queries:
+            search.value = ""
+            await pilot.pause()
+            for character in query:
+                start = time.perf_counter()
+                await pilot.press(character)
+                await pilot.pause()
+                latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {"median": statistics.median(latencies), "p99": latencies[int(0.99 * (len(latencies) - 1))],
+            "max": latencies[-1]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    args = parser.parse_args()
+
+    service_configs = Config(generate_config(args.services, args.depth, args.fanout)).get_services()
+    queries = get_queries(args.services)
+
+    start = time.perf_counter()
+    index = ServiceIndex(service_configs)
+    print(f"{'index build':>16}: {(time.perf_counter() - start) * 1000:7.1f} ms, {len(index.trigrams)} trigrams")
+
+    for name, latencies in [("index keystroke", type_into_index(index, queries)),
+                            ("app keystroke", asyncio.run(type_into_app(service_configs, queries))),
+                            ("pilot keystroke", asyncio.run(type_into_app([], queries)))]:
+        summary = summarize(latencies)
+        print(f"{name:>16}: " + ", ".join(f"{key} {value * 1000:7.2f} ms" for key, value in summary.items()))
+
+
+if __name__ == "__main__":
+    main()
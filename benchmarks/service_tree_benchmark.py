@@ -0,0 +1,82 @@
+"""Measure how long building the service tree takes and how much memory it holds for large configurations.
+
+Services are spread over groups nested `--depth` levels deep with `--fanout` groups per level.
+
+    python -m benchmarks.service_tree_benchmark --services 5000 --depth 3 --fanout 10
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from textual.app import App, ComposeResult
+
+from components.service.service_tree import ServiceTree, index_services
+from config.config import Config, ServiceConfig
+
+
+def generate_config(services: int, depth: int, fanout: int) -> Dict[str, Any]:
+    def get_hierarchy(i: int) -> str:
+        return "".join(f"group-{level}-{(i // fanout ** level) % fanout}/" for level in range(depth))
+
+    sensor = {"sensor_type": "prometheus", "name": "up", "url": "http://localhost:9",
+              "metrics": [{"name": "up", "query": 'up{instance="$label"}'}]}
+    return {"services": [{"name": f"service-{i}", "hierarchy": get_hierarchy(i), "context": {"label": f"service-{i}"},
+                          "sensors": [sensor]} for i in range(services)]}
+
+
+class TreeApp(App):
+    def __init__(self, service_configs: List[ServiceConfig]) -> None:
+        super().__init__()
+        self.service_configs = service_configs
+
+    def compose(self) -> ComposeResult:
+        yield ServiceTree(self.service_configs)
+
+
+async def mount_tree(service_configs: List[ServiceConfig]) -> Dict[str, float]:
+    start = time.perf_counter()
+    app = TreeApp(service_configs)
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        first_frame = time.perf_counter() - start
+        group = app.query_one(ServiceTree).root.children[0]
+        start = time.perf_counter()
+        group.expand()
+        await pilot.pause()
+        expand_group = time.perf_counter() - start
+    return {"first_frame_seconds": first_frame, "expand_group_seconds": expand_group}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=5000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=10)
+    args = parser.parse_args()
+
+    yaml_config = generate_config(args.services, args.depth, args.fanout)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    service_configs = Config(yaml_config).get_services()
+    for service in service_configs:
+        service.get_hierarchy()
+    parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index = index_services(service_configs)
+    index_seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = {"parse_seconds": parse_seconds, "index_seconds": index_seconds}
+    results |= asyncio.run(mount_tree(service_configs))
+    for metric, seconds in results.items():
+        print(f"{metric:>20}: {seconds * 1000:9.1f} ms")
+    print(f"{'groups':>20}: {len(index) - 1:9d}")
+    print(f"{'index memory':>20}: {peak_bytes / 2 ** 20:9.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
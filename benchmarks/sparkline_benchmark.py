@@ -0,0 +1,50 @@
+"""Measure the cost of appending a reading to a sparkline series and reading it back for drawing.
+
+Each history size is compared between handing the sparkline the full history and downsampling it to the width of the
+sparkline by min/max bucketing.
+
+    python -m benchmarks.sparkline_benchmark --width 80 --updates 2000
+"""
+import argparse
+import random
+import time
+
+from sensors.min_max_series import MinMaxSeries
+from sensors.ring_buffer import RingBuffer
+
+
+def measure(history_size: int, width: int, updates: int) -> tuple:
+    full, downsampled = RingBuffer(history_size), MinMaxSeries(history_size, width)
+    for _ in range(history_size):
+        value = random.random()
+        full.append(value)
+        downsampled.append(value)
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        full.append(random.random())
+        full.to_list()
+    full_seconds = (time.perf_counter() - start) / updates
+
+    start = time.perf_counter()
+    for _ in range(updates):
+        downsampled.append(random.random())
+        downsampled.to_array()
+    downsampled_seconds = (time.perf_counter() - start) / updates
+    return full_seconds, downsampled_seconds, len(downsampled.to_array())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=80)
+    parser.add_argument("--updates", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'history':>8} {'full':>12} {'downsampled':>12} {'cells':>6}")
+    for history_size in [60, 600, 3600, 36000, 360000]:
+        full_seconds, downsampled_seconds, cells = measure(history_size, args.width, args.updates)
+        print(f"{history_size:>8} {full_seconds * 1e6:>9.1f} us {downsampled_seconds * 1e6:>9.1f} us {cells:>6}")
+
+
+if __name__ == "__main__":
+    main()
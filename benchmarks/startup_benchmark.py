@@ -0,0 +1,89 @@
+"""Measure how long `python main.py` takes to import and to render its first frame.
+
+Every run starts a fresh interpreter so import costs are included, the app is run headless against a generated
+configuration using a single sensor backend.
+
+    python -m benchmarks.startup_benchmark --runs 10 --services 100 --sensor-type prometheus
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import yaml
+
+BACKEND_MODULES = ["elasticsearch", "opensearchpy", "aiohttp"]
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+from main import ServiceStatusApp
+imported = time.perf_counter()
+
+async def run_app():
+    app = ServiceStatusApp()
+    async with app.run_test() as pilot:
+        await pilot.pause()
+        return time.perf_counter()
+
+first_frame = asyncio.run(run_app())
+print(json.dumps({
+    "import_seconds": imported - start,
+    "first_frame_seconds": first_frame - start,
+    "backend_modules": [module for module in %r if module in sys.modules],
+}))
+"""
+
+
+def generate_config(services: int, sensor_type: str) -> dict:
+    sensor = {
+        "sensor_type": sensor_type,
+        "name": f"{sensor_type}_sensor",
+        "url": "http://localhost:9",
+    }
+    if sensor_type == "prometheus":
+        sensor["metrics"] = [{"name": "up", "query": 'up{instance="$label"}'}]
+    else:
+        sensor |= {"index_pattern": "logs-*", "max_hits": 50, "query": {"match": {"service": "$label"}},
+                   "result_fields": ["@timestamp", "message"]}
+    return {
+        "title": "Startup Benchmark",
+        "services": [{"name": f"service-{i}", "hierarchy": f"group-{i % 10}/", "context": {"label": f"service-{i}"},
+                      "sensors": [sensor]} for i in range(services)],
+    }
+
+
+def run_probe(config_path: str) -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = os.environ | {"CONFIG_FILE_PATH": config_path}
+    output = subprocess.run([sys.executable, "-c", PROBE % BACKEND_MODULES], cwd=root, env=environment,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--services", type=int, default=100)
+    parser.add_argument("--sensor-type", default="prometheus", choices=["prometheus", "elastic", "open_search"])
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as config_file:
+        yaml.dump(generate_config(args.services, args.sensor_type), config_file)
+    try:
+        results = [run_probe(config_file.name) for _ in range(args.runs)]
+    finally:
+        os.unlink(config_file.name)
+
+    for metric in ["import_seconds", "first_frame_seconds"]:
+        values = [result[metric] for result in results]
+        print(f"{metric:>20}: median {statistics.median(values) * 1000:7.1f} ms, "
+              f"min {min(values) * 1000:7.1f} ms, max {max(values) * 1000:7.1f} ms")
+    print(f"{'backend modules':>20}: {', '.join(results[-1]['backend_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
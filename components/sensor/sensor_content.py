@@ -1,51 +1,156 @@
-from typing import Dict, Any
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Iterable, Optional, Tuple
 
 from rich.text import Text
 from textual.app import ComposeResult
-from textual.timer import Timer
-from textual.widgets import Static
+from textual.widgets import Static, DataTable
 
+from components.sensor.sensor_details import SensorDetails
 from components.sensor.sensor_sparkline import SensorSparkline
 from components.sensor.sensor_table import SensorTable
 from components.sensor.sensor_widget import SensorWidget
+from components.sensor.update_pipeline import update_pipeline
 from config.config import SensorConfig, ComponentType
-from sensors.sensor_resolver import resolve_sensor
+from sensors.fetch_scheduler import PRIORITY_SELECTED, PRIORITY_VISIBLE, prioritized
+from sensors.metrics import metrics
+from sensors.polling_engine import PollingEngine, Subscription
+from sensors.sensor import SensorReading
 
 
 class SensorContent(Static):
     sensor_data = None
-    update_timer: Timer = None
+    fetched_at: Optional[float] = None
+    subscription: Optional[Subscription] = None
+    shown = True
 
-    def __init__(self, sensor_config: SensorConfig, context: Dict[str, Any]) -> None:
+    def __init__(self, sensor_config: SensorConfig, context: Dict[str, Any], polling_engine: PollingEngine) -> None:
         super().__init__()
         self.sensor_config = sensor_config
-        self.sensor = resolve_sensor(sensor_config, context)
+        self.polling_engine = polling_engine
+        self.sensor = polling_engine.resolve_sensor(sensor_config, context)
         self.poll_wait_seconds = sensor_config.get_poll_wait_seconds()
+        self.pending_updates: Deque[Tuple[Iterable[SensorReading], float]] = deque()
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the sensor."""
-        yield Static(renderable=Text(self.sensor_config.get_name()))
+        yield Static(renderable=Text(self.sensor_config.get_name()), classes="sensor-title")
 
         match self.sensor_config.get_component_type():
             case ComponentType.TABLE:
                 yield SensorTable(self.sensor_config.get_name(), self.sensor.get_sensor_fields(),
-                                  self.sensor_config.complete_refresh())
+                                  self.sensor_config.complete_refresh(), self.sensor_config.get_max_rows())
             case ComponentType.SPARKLINE:
-                yield SensorSparkline(self.sensor.get_sensor_fields())
+                yield SensorSparkline(self.sensor.get_sensor_fields(), self.sensor_config.get_history_size())
 
-    async def on_mount(self) -> None:
+    def on_mount(self) -> None:
         """Event handler called when sensor widget is added to the app."""
-        self.update_timer = self.set_interval(self.poll_wait_seconds, self.update_sensor_data)
-        await self.update_sensor_data()
+        self.pending_updates = deque(maxlen=self.query_one(SensorWidget).max_pending_updates)
+        self.call_after_refresh(self.subscribe)
+        self.watch(self.parent, "scroll_y", lambda _: self.call_after_refresh(self.update_in_view), init=False)
 
-    async def update_sensor_data(self):
-        """Fetch new sensor data."""
+    def on_resize(self) -> None:
+        self.update_in_view()
+
+    def on_unmount(self) -> None:
+        """Event handler called when sensor widget is removed from the app."""
+        if self.subscription is not None:
+            self.subscription.cancel()
+            self.subscription = None
+
+    async def subscribe(self) -> None:
+        """Backfill the sensor widget and register the sensor with the shared polling engine once mounted."""
+        sensor_widget = self.query_one(SensorWidget)
+        if sensor_widget.history_size > 0:
+            end = time.time()
+            start = end - sensor_widget.history_size * self.poll_wait_seconds
+            try:
+                with prioritized(PRIORITY_SELECTED):
+                    history = await self.polling_engine.fetch_history(self.sensor, start, end, self.poll_wait_seconds)
+                sensor_widget.backfill_data(history)
+            except Exception as backfill_exception:
+                # the backfill only saves waiting for polls to fill the widget, polling starts regardless
+                self.log.warning(f"backfill of {self.sensor_config.get_name()} failed: {backfill_exception!r}")
+
+        if self.is_attached and self.subscription is None:
+            self.subscription = self.polling_engine.subscribe(self.sensor, self.poll_wait_seconds, self.update_sensor_data)
+            self.update_in_view()
+            self.show(self.shown)
+
+    def is_in_view(self) -> bool:
+        return self.parent is not None and self.region.overlaps(self.parent.region)
+
+    def update_in_view(self) -> None:
+        """Let the requests of sensors scrolled into view in before those of the rest of the selected service, and
+        draw the readings they missed while out of view."""
+        in_view = self.is_in_view()
+        if self.subscription is not None:
+            self.subscription.set_priority(PRIORITY_VISIBLE if in_view else PRIORITY_SELECTED)
+        if in_view and self.pending_updates:
+            update_pipeline.schedule(self)
+
+    def update_sensor_data(self, sensor_data: Iterable[SensorReading], fetched_at: float) -> None:
+        """Queue sensor data fetched by the polling engine, drawn on the next frame or once scrolled into view."""
+        self.pending_updates.append((sensor_data, fetched_at))
+        if self.is_in_view():
+            update_pipeline.schedule(self)
+
+    def apply_updates(self) -> None:
+        """Display the queued sensor data, marking cached data due for a refresh as stale."""
+        if not self.pending_updates:
+            return
         sensor_widget = self.query_one(SensorWidget)
-        self.sensor_data = await self.sensor.fetch_sensor_data()
-        sensor_widget.update_data(self.sensor_data)
+        updates = list(self.pending_updates)
+        self.pending_updates.clear()
+        with metrics.timer("widget_update_seconds",
+                           {"sensor": self.sensor_config.get_name(), "widget": type(sensor_widget).__name__}):
+            for sensor_data, _ in updates:
+                sensor_widget.update_data(sensor_data)
+        self.sensor_data, self.fetched_at = updates[-1]
+        self.update_title()
+
+    def update_title(self) -> None:
+        """Mark the displayed data as stale once it is older than the poll interval."""
+        if self.fetched_at is None:
+            return
+        age_seconds = time.time() - self.fetched_at
+        stale = age_seconds > self.poll_wait_seconds
+        title = Text(self.sensor_config.get_name())
+        if stale:
+            title.append(f" (stale, fetched {self.format_age(age_seconds)} ago)", style="italic")
+        self.query_one(".sensor-title", Static).update(title)
+        self.set_class(stale, "-stale")
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        """Open the details of the selected row, fetching them from the sensor."""
+        event.stop()
+        if event.row_key.value is not None:
+            self.run_worker(self.show_details(event.row_key.value))
+
+    async def show_details(self, key: str) -> None:
+        with prioritized(PRIORITY_VISIBLE):
+            details = await self.sensor.fetch_sensor_details(key)
+        if details is not None:
+            self.app.push_screen(SensorDetails(f"{self.sensor_config.get_name()}: {key}", details))
+
+    @staticmethod
+    def format_age(age_seconds: float) -> str:
+        minutes, seconds = divmod(int(age_seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}h {minutes}m"
+        if minutes:
+            return f"{minutes}m {seconds}s"
+        return f"{seconds}s"
 
     def show(self, show: bool) -> None:
+        self.shown = show
+        if self.subscription is None:
+            return
         if show:
-            self.update_timer.resume()
+            self.subscription.resume()
+            # data fetched before the sensor was hidden may have gone stale without a new delivery
+            self.update_title()
+            self.call_after_refresh(self.update_in_view)
         else:
-            self.update_timer.pause()
+            self.subscription.pause()
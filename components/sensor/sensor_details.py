@@ -0,0 +1,23 @@
+from rich.console import RenderableType
+from rich.pretty import Pretty
+from textual.app import ComposeResult
+from textual.containers import VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Static
+
+
+class SensorDetails(ModalScreen):
+    BINDINGS = [
+        ("escape", "dismiss", "Close"),
+        ("q", "dismiss", "Close"),
+    ]
+
+    def __init__(self, title: str, details: RenderableType) -> None:
+        super().__init__()
+        self.details_title = title
+        self.details = details
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the details."""
+        details = self.details if isinstance(self.details, str) else Pretty(self.details)
+        yield VerticalScroll(Static(self.details_title, classes="details-title"), Static(details))
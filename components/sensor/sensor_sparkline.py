@@ -1,5 +1,6 @@
+from array import array
 from statistics import mean
-from typing import Iterable
+from typing import Iterable, List, Sequence
 
 from rich.console import RenderableType
 from textual.app import ComposeResult
@@ -7,6 +8,7 @@ from textual.containers import Horizontal
 from textual.widgets import Sparkline, Static
 
 from components.sensor.sensor_widget import SensorWidget
+from sensors.min_max_series import MinMaxSeries
 from sensors.sensor import SensorReading
 
 
@@ -19,10 +21,14 @@ class SensorSparkline(SensorWidget):
     }
     """
 
-    def __init__(self, columns: Iterable[RenderableType]):
+    def __init__(self, columns: Iterable[RenderableType], history_size: int):
         super(SensorSparkline, self).__init__()
         self.columns = list(columns)
         self.latest_readings = [None] * len(self.columns)
+        self.history_size = history_size
+        self.max_pending_updates = max(1, history_size)
+        self.series = [MinMaxSeries(history_size) for _ in self.columns]
+        self.cells = [array("d") for _ in self.columns]
 
     def compose(self) -> ComposeResult:
         yield Static()
@@ -39,15 +45,21 @@ class SensorSparkline(SensorWidget):
             sparkline.set_loading(True)
         self.set_styles(f"height: {len(self.columns) * 2 + 1}; align-vertical: middle;")
 
+    def on_resize(self) -> None:
+        self.render_series()
+
     def update_data(self, readings: Iterable[SensorReading]):
-        data = [list(reading.values) for reading in readings]
+        data = [reading.values for reading in readings]
+        if not data or not data[0]:
+            return
 
         if len(data[0]) == len(self.columns):
             self.latest_readings = data[-1]
-            sparklines = self.query(Sparkline)
-            for i, sparkline in enumerate(sparklines):
-                sparkline.set_loading(False)
-                sparkline.data = [float(x[i]) for x in data]
+            if len(data) > 1:
+                # a series of readings replaces the history, a single reading is the next sample
+                for series in self.series:
+                    series.clear()
+            self.append_data(data)
         else:
             self.latest_readings = [data[0][0]] * len(self.columns)
 
@@ -56,3 +68,28 @@ class SensorSparkline(SensorWidget):
             static.update(self.latest_readings[i])
 
         self.refresh()
+
+    def backfill_data(self, readings: Iterable[SensorReading]):
+        self.append_data([reading.values for reading in readings if len(reading.values) == len(self.columns)])
+
+    def append_data(self, data: List[Sequence[RenderableType]]):
+        for i, series in enumerate(self.series):
+            for row in data:
+                try:
+                    series.append(float(row[i]))
+                except (TypeError, ValueError):
+                    continue
+        self.render_series()
+
+    def render_series(self):
+        """Downsample every series to the width of its sparkline, which is only repainted when a cell changed."""
+        for i, (series, sparkline) in enumerate(zip(self.series, self.query(Sparkline))):
+            if len(series) == 0:
+                continue
+            if series.width != sparkline.size.width:
+                series.resize(sparkline.size.width)
+            cells = series.to_array()
+            if cells != self.cells[i]:
+                self.cells[i] = cells
+                sparkline.set_loading(False)
+                sparkline.data = cells
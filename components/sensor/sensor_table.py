@@ -1,8 +1,9 @@
-from typing import Iterable
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from rich.console import RenderableType
 from textual.app import ComposeResult
 from textual.widgets import DataTable
+from textual.widgets.data_table import ColumnKey
 
 from components.sensor.sensor_widget import SensorWidget
 from sensors.sensor import SensorReading
@@ -10,11 +11,15 @@ from sensors.sensor import SensorReading
 
 class SensorTable(SensorWidget):
 
-    def __init__(self, name: str, columns: Iterable[RenderableType], complete_refresh: bool):
+    def __init__(self, name: str, columns: Iterable[RenderableType], complete_refresh: bool, max_rows: int):
         super(SensorTable, self).__init__()
         self.table_name = name
-        self.columns = columns
+        self.columns = list(columns)
+        self.column_keys: List[ColumnKey] = []
         self.complete_refresh = complete_refresh
+        self.max_rows = max_rows
+        self.max_pending_updates = 1 if complete_refresh else max_rows
+        self.table_height = 0
 
     def compose(self) -> ComposeResult:
         yield DataTable(name=self.table_name, cursor_type="row")
@@ -22,17 +27,87 @@ class SensorTable(SensorWidget):
     def on_mount(self) -> None:
         table = self.query_one(DataTable)
         table.set_loading(True)
-        table.add_columns(*self.columns)
+        self.column_keys = table.add_columns(*self.columns)
 
     def update_data(self, rows: Iterable[SensorReading]):
         table = self.query_one(DataTable)
         table.set_loading(False)
-        if self.complete_refresh:
-            table.clear()
+        cursor_key = self.get_cursor_key(table)
 
-        table.add_rows(map(lambda row: row.get_values(), rows))
+        if self.complete_refresh:
+            self.replace_rows(table, self.get_keyed_rows(rows))
+        else:
+            self.append_rows(table, rows)
+            self.evict_rows(table)
 
-        table.add_rows([[]])
-        self.set_styles(f"height: {len(table.rows) + 1};")
+        if cursor_key is not None and cursor_key in table.rows:
+            table.move_cursor(row=table.get_row_index(cursor_key))
+        if self.table_height != table.row_count + 2:
+            self.table_height = table.row_count + 2
+            self.set_styles(f"height: {self.table_height};")
         self.refresh()
 
+    def get_keyed_rows(self, rows: Iterable[SensorReading]) -> Dict[str, List[RenderableType]]:
+        """Key rows by their reading key, rows without one are keyed by their position."""
+        keyed_rows = {}
+        for i, row in enumerate(rows):
+            if len(keyed_rows) >= self.max_rows:
+                break
+            key = row.get_key() if row.get_key() is not None else f"#{i}"
+            keyed_rows.setdefault(key, self.pad_values(row.get_values()))
+        return keyed_rows
+
+    def replace_rows(self, table: DataTable, keyed_rows: Dict[str, List[RenderableType]]):
+        """Replace the table content by only touching rows that were added, removed or changed.
+
+        Rows can only be appended to a DataTable, so rows are put in the order of keyed_rows by sorting the table
+        afterwards, e.g. when a new document precedes those already shown. The sort key only gets the values of a row,
+        so rows are recognised by the identity of their cells, rows sharing all their cells keep their order.
+        """
+        for key in [row.key.value for row in table.ordered_rows if row.key.value not in keyed_rows]:
+            table.remove_row(key)
+        self.upsert_rows(table, keyed_rows)
+
+        if [row.key.value for row in table.ordered_rows] != list(keyed_rows):
+            positions = {self.get_cells_identity(table.get_row(key)): position
+                         for position, key in enumerate(keyed_rows)}
+            table.sort(key=lambda values: positions[self.get_cells_identity(values)])
+
+    def append_rows(self, table: DataTable, rows: Iterable[SensorReading]):
+        """Append new rows and update the rows already shown, rows without a key are always appended."""
+        for row in rows:
+            key = row.get_key()
+            if key is None:
+                table.add_row(*row.get_values())
+            else:
+                self.upsert_rows(table, {key: self.pad_values(row.get_values())})
+
+    def upsert_rows(self, table: DataTable, keyed_rows: Dict[str, List[RenderableType]]):
+        for key, values in keyed_rows.items():
+            if key not in table.rows:
+                table.add_row(*values, key=key)
+                continue
+            for column_key, current_value, value in zip(self.column_keys, table.get_row(key), values):
+                if current_value != value:
+                    table.update_cell(key, column_key, value, update_width=True)
+
+    def evict_rows(self, table: DataTable):
+        """Remove the oldest rows beyond max_rows."""
+        excess_rows = table.row_count - self.max_rows
+        if excess_rows > 0:
+            for row in table.ordered_rows[:excess_rows]:
+                table.remove_row(row.key)
+
+    def pad_values(self, values: Iterable[RenderableType]) -> List[RenderableType]:
+        values = list(values)
+        return values + [""] * (len(self.columns) - len(values))
+
+    @staticmethod
+    def get_cells_identity(values: Iterable[RenderableType]) -> Tuple[int, ...]:
+        return tuple(map(id, values))
+
+    @staticmethod
+    def get_cursor_key(table: DataTable) -> Optional[str]:
+        if 0 <= table.cursor_row < table.row_count:
+            return table.ordered_rows[table.cursor_row].key.value
+        return None
@@ -6,6 +6,9 @@ from sensors.sensor import SensorReading
 
 
 class SensorWidget(Widget):
+    history_size = 0
+    # readings kept for the widget while it is out of view, only the latest is needed by widgets replacing their data
+    max_pending_updates = 1
 
     def __init__(self) -> None:
         super().__init__()
@@ -13,4 +16,8 @@ class SensorWidget(Widget):
     def update_data(self, rows: Iterable[SensorReading]):
         pass
 
+    def backfill_data(self, rows: Iterable[SensorReading]):
+        """Seed the widget with historic readings, only called for widgets with a history_size."""
+        pass
+
 
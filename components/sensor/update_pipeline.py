@@ -0,0 +1,40 @@
+import asyncio
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from components.sensor.sensor_content import SensorContent
+
+FRAME_SECONDS = 1 / 60
+
+
+class UpdatePipeline:
+    """Applies the readings queued by sensor widgets once per frame.
+
+    All widgets due within a frame are updated in one batch of screen updates, so the height changes of any number of
+    them are laid out in a single reflow rather than one each.
+    """
+
+    def __init__(self, frame_seconds: float = FRAME_SECONDS) -> None:
+        super().__init__()
+        self.frame_seconds = frame_seconds
+        self.queued: Dict["SensorContent", None] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def schedule(self, content: "SensorContent") -> None:
+        """Apply the queued readings of the widget on the next frame."""
+        self.queued[content] = None
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.frame_seconds, self.flush)
+
+    def flush(self) -> None:
+        queued, self.queued = self.queued, {}
+        self.flush_handle = None
+        contents = [content for content in queued if content.is_attached]
+        if not contents:
+            return
+        with contents[0].app.batch_update():
+            for content in contents:
+                content.apply_updates()
+
+
+update_pipeline = UpdatePipeline()
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import Optional
 
 from textual.app import ComposeResult
@@ -7,50 +8,64 @@ from textual.widgets import Static
 
 from components.sensor.sensor_content import SensorContent
 from config.config import Config, ServiceConfig
+from sensors.polling_engine import PollingEngine
 
 
 class ServiceContent(Static):
     selected_service_config = reactive(None)
 
-    def __init__(self, config: Config, id: Optional[str] = None) -> None:
+    def __init__(self, config: Config, polling_engine: PollingEngine, id: Optional[str] = None) -> None:
         super().__init__(id=id)
         self.config = config
+        self.polling_engine = polling_engine
+        self.max_service_panels = max(1, config.get_max_service_panels())
+        self.service_panels: OrderedDict[str, ServiceContentData] = OrderedDict()
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
-        yield ServiceContentData(None, id="service-content-data")
+        yield ServiceContentData(None, self.polling_engine, id="service-content-data")
 
     def update_selected_service(self, service: ServiceConfig):
         """Update the service which to display sensor data for by replacing the content using a different config."""
         self.selected_service_config = service
         content_id = f"service-content-data-{service.get_name().replace(' ', '_')}"
-        should_create_new_content = True
 
-        for content_data in self.query(ServiceContentData):
-            if content_data.id == content_id:
-                content_data.show(True)
-                should_create_new_content = False
-            else:
-                content_data.show(False)
+        for content_data in self.service_panels.values():
+            content_data.show(content_data.id == content_id)
 
-        if should_create_new_content:
-            content_data = ServiceContentData(service, id=content_id)
+        if content_id in self.service_panels:
+            self.service_panels.move_to_end(content_id)
+        else:
+            content_data = ServiceContentData(service, self.polling_engine, id=content_id)
             content_data.show(True)
+            self.service_panels[content_id] = content_data
             self.mount(content_data)
+            self.evict_service_panels()
+
+    def evict_service_panels(self):
+        """Unmount the least recently viewed panels beyond max_service_panels, releasing their sensors.
+
+        Evicted panels are rebuilt when their service is selected again, drawing from the sensor cache.
+        """
+        while len(self.service_panels) > self.max_service_panels:
+            _, content_data = self.service_panels.popitem(last=False)
+            content_data.remove()
 
 
 class ServiceContentData(Static):
 
-    def __init__(self, service_config: Optional[ServiceConfig], id: Optional[str] = None):
+    def __init__(self, service_config: Optional[ServiceConfig], polling_engine: PollingEngine,
+                 id: Optional[str] = None):
         super().__init__(id=id)
         self.service_config = service_config
+        self.polling_engine = polling_engine
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
         if self.service_config is None:
             sensor_content = []
         else:
-            sensor_content = [SensorContent(sensor_config, self.service_config.get_context())
+            sensor_content = [SensorContent(sensor_config, self.service_config.get_context(), self.polling_engine)
                               for sensor_config in self.service_config.get_sensors()]
 
         yield VerticalScroll(*sensor_content)
@@ -0,0 +1,62 @@
+from typing import Dict, List, Set, Tuple
+
+from config.config import ServiceConfig
+
+
+class ServiceIndex:
+    """Trigram index over the names, hierarchies and context values of services.
+
+    A query matches the services containing each of its whitespace separated terms. Candidates are taken from the
+    shortest trigram posting list of the query, or from the matches of the previous query when the query was extended
+    by typing, and are then checked by substring.
+    """
+
+    def __init__(self, service_configs: List[ServiceConfig]) -> None:
+        super().__init__()
+        self.service_configs = service_configs
+        self.names = [service.get_name().lower() for service in service_configs]
+        self.texts = [" ".join([service.get_name(), "/".join(service.get_hierarchy()),
+                                *map(str, service.get_context().values())]).lower() for service in service_configs]
+        self.trigrams: Dict[str, List[int]] = {}
+        for i, text in enumerate(self.texts):
+            for trigram in self.get_trigrams(text):
+                self.trigrams.setdefault(trigram, []).append(i)
+        self.last_query = ""
+        self.last_matches: List[int] = list(range(len(service_configs)))
+
+    @staticmethod
+    def get_trigrams(text: str) -> Set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def get_candidates(self, query: str, terms: List[str]) -> List[int]:
+        if self.last_query and query.startswith(self.last_query):
+            return self.last_matches
+        posting_lists = [self.trigrams.get(trigram, []) for term in terms for trigram in self.get_trigrams(term)]
+        if not posting_lists:
+            return list(range(len(self.texts)))
+        return min(posting_lists, key=len)
+
+    def search(self, query: str, limit: int = 100) -> Tuple[List[ServiceConfig], int]:
+        """Best matches first, services whose name starts with or contains the first term before the others.
+
+        Returns up to limit matching services together with the total number of matches.
+        """
+        query = query.lower()
+        terms = query.split()
+        if not terms:
+            self.last_query, self.last_matches = "", list(range(len(self.texts)))
+            return [], 0
+
+        texts, names, first_term = self.texts, self.names, terms[0]
+        matches = self.get_candidates(query, terms)
+        for term in terms:
+            matches = [i for i in matches if term in texts[i]]
+        self.last_query, self.last_matches = query, matches
+
+        # lower ranks are only looked for while the higher ones do not fill the limit
+        best = [i for i in matches if names[i].startswith(first_term)][:limit]
+        if len(best) < limit:
+            best += [i for i in matches if first_term in names[i] and not names[i].startswith(first_term)]
+        if len(best) < limit:
+            best += [i for i in matches if first_term not in names[i]]
+        return [self.service_configs[i] for i in best[:limit]], len(matches)
@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+from textual.message import Message
+from textual.widgets import Input
+
+from components.service.service_index import ServiceIndex
+from config.config import ServiceConfig
+
+
+class ServiceSearch(Input):
+    """Search box narrowing down services as it is typed in, up and down step through the matches."""
+
+    BINDINGS = [
+        ("down", "next_match", "Next match"),
+        ("up", "previous_match", "Previous match"),
+        ("escape", "clear", "Clear search"),
+    ]
+
+    class Matched(Message):
+        """The current match changed while searching."""
+
+        def __init__(self, service: ServiceConfig) -> None:
+            super().__init__()
+            self.service = service
+
+    class Selected(Message):
+        """The current match was chosen."""
+
+        def __init__(self, service: ServiceConfig) -> None:
+            super().__init__()
+            self.service = service
+
+    def __init__(self, service_configs: List[ServiceConfig]) -> None:
+        super().__init__(placeholder="Search services")
+        self.index = ServiceIndex(service_configs)
+        self.matches: List[ServiceConfig] = []
+        self.match_count = 0
+        self.current = 0
+
+    def get_current_match(self) -> Optional[ServiceConfig]:
+        return self.matches[self.current] if self.matches else None
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        self.matches, self.match_count = self.index.search(event.value)
+        self.show_match(0)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        if self.get_current_match() is not None:
+            self.post_message(self.Selected(self.get_current_match()))
+
+    def show_match(self, current: int) -> None:
+        self.current = current
+        if not self.value.strip():
+            self.border_subtitle = ""
+        elif not self.matches:
+            self.border_subtitle = "no matches"
+        else:
+            self.border_subtitle = f"{self.current + 1}/{self.match_count}"
+            self.post_message(self.Matched(self.get_current_match()))
+
+    def action_next_match(self) -> None:
+        if self.matches:
+            self.show_match((self.current + 1) % len(self.matches))
+
+    def action_previous_match(self) -> None:
+        if self.matches:
+            self.show_match((self.current - 1) % len(self.matches))
+
+    def action_clear(self) -> None:
+        self.value = ""
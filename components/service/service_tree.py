@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from rich.style import Style
 from rich.text import Text
@@ -15,6 +15,24 @@ class ServiceEntry:
     name: str
     is_group: bool
     service_config: Optional[ServiceConfig]
+    path: Tuple[str, ...] = ()
+
+
+def index_services(service_configs: List[ServiceConfig]) -> Dict[Tuple[str, ...], List[ServiceEntry]]:
+    """Map the path of every group to its groups and services, in the order they first appear in the configuration."""
+    children: Dict[Tuple[str, ...], List[ServiceEntry]] = {(): []}
+    for service in service_configs:
+        path = ()
+        for group_name in service.get_hierarchy():
+            if group_name == "":
+                continue
+            group_path = path + (group_name,)
+            if group_path not in children:
+                children[group_path] = []
+                children[path].append(ServiceEntry(group_name, True, None, group_path))
+            path = group_path
+        children[path].append(ServiceEntry(service.get_name(), False, service, path))
+    return children
 
 
 class ServiceTree(Tree[ServiceEntry]):
@@ -27,32 +45,67 @@ class ServiceTree(Tree[ServiceEntry]):
         data = ServiceEntry("sensors", True, None)
         super().__init__("sensors", data)
         self.service_configs = service_configs
+        self.children_by_path = index_services(service_configs)
+        self.group_nodes: Dict[Tuple[str, ...], TreeNode[ServiceEntry]] = {(): self.root}
+        self.service_nodes: Dict[ServiceConfig, TreeNode[ServiceEntry]] = {}
+        self.shown_groups: List[TreeNode[ServiceEntry]] = []
 
     def on_mount(self) -> None:
-        max_len = 0
-        for service in self.service_configs:
-            parent_group = self.root
-            max_len = max(max_len, len(" ".join(service.get_hierarchy())))
-            for group_name in service.get_hierarchy():
-                if group_name == "":
-                    continue
-                matching_children = [child for child in parent_group.children if child.data.name == group_name]
-                if len(matching_children) == 0:
-                    next_node = ServiceEntry(group_name, True, None)
-                    parent_group.add(group_name, next_node)
-                parent_group = [child for child in parent_group.children if child.data.name == group_name][0]
-            parent_group.add(service.get_name(), ServiceEntry(service.get_name(), False, service))
-
+        max_len = max((len(" ".join(service.get_hierarchy())) for service in self.service_configs), default=0)
         self.set_styles(f"width: {max_len + 15};")
+        self.populate(self.root)
         self.root.expand()
         self.refresh(layout=True)
 
+    def populate(self, node: TreeNode[ServiceEntry]) -> None:
+        """Add the children of a group the first time it is expanded, collapsed groups stay empty."""
+        if node.children:
+            return
+        for entry in self.children_by_path.get(node.data.path, []):
+            child = node.add(entry.name, entry)
+            if entry.is_group:
+                self.group_nodes[entry.path] = child
+            else:
+                self.service_nodes[entry.service_config] = child
+
+    def show_service(self, service: ServiceConfig) -> None:
+        """Expand the groups of a service and move the cursor to it.
+
+        Groups expanded only to show the previous service are collapsed again, so stepping through search results
+        does not grow the tree.
+        """
+        path = ()
+        groups = [self.root]
+        for group_name in service.get_hierarchy():
+            if group_name == "":
+                continue
+            self.populate(groups[-1])
+            path = path + (group_name,)
+            groups.append(self.group_nodes[path])
+        self.populate(groups[-1])
+
+        for group_node in self.shown_groups:
+            if group_node not in groups:
+                group_node.collapse()
+        self.shown_groups = [group_node for group_node in self.shown_groups if group_node in groups]
+
+        for group_node in groups:
+            if not group_node.is_expanded:
+                group_node.expand()
+                self.shown_groups.append(group_node)
+        self.call_after_refresh(self.move_cursor, self.service_nodes[service])
+
+    def move_cursor(self, node: TreeNode[ServiceEntry]) -> None:
+        self.select_node(node)
+        self.scroll_to_node(node, animate=False)
+
     def on_tree_node_expanded(self, event: Tree.NodeSelected) -> None:
         event.stop()
         entry = event.node.data
         if entry is None:
             return
         if entry.is_group:
+            self.populate(event.node)
             return
         else:
             self.post_message(self.Selected(entry))
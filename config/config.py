@@ -1,14 +1,19 @@
 import os
 from enum import Enum
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional
 
 import yaml
 
+# libyaml's loader is an order of magnitude faster on large configurations
+YamlLoader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
 
 class SensorType(Enum):
     ELASTIC = 1
     PROMETHEUS = 2
     OPEN_SEARCH = 3
+    SELF = 4
+    SSE = 5
 
 
 class ComponentType(Enum):
@@ -31,25 +36,40 @@ class SensorConfig:
         return ComponentType[self.yaml_config.get("component_type", "table").upper()]
 
     def complete_refresh(self) -> bool:
-        return self.yaml_config.get("complete_refresh", True)
+        return self.yaml_config.get("complete_refresh", not self.tail() and self.get_sensor_type() != SensorType.SSE)
+
+    def tail(self) -> bool:
+        return self.yaml_config.get("tail", False)
+
+    def get_max_rows(self) -> int:
+        return self.yaml_config.get("max_rows", 1000)
 
     def get_poll_wait_seconds(self) -> int:
         return self.yaml_config.get("poll_wait_seconds", 30)
 
+    def get_history_size(self) -> int:
+        return self.yaml_config.get("history_size", 60)
+
 
 class ServiceConfig:
     def __init__(self, yaml_config: Dict[str, Any]) -> None:
         super().__init__()
         self.yaml_config = yaml_config
+        self.sensors: Optional[List[SensorConfig]] = None
+        self.hierarchy: Optional[List[str]] = None
 
     def get_name(self):
         return self.yaml_config["name"]
 
     def get_sensors(self) -> List[SensorConfig]:
-        return [SensorConfig(service) for service in self.yaml_config.get("sensors", [])]
+        if self.sensors is None:
+            self.sensors = [SensorConfig(service) for service in self.yaml_config.get("sensors", [])]
+        return self.sensors
 
     def get_hierarchy(self) -> List[str]:
-        return self.yaml_config.get("hierarchy", "").split("/")
+        if self.hierarchy is None:
+            self.hierarchy = self.yaml_config.get("hierarchy", "").split("/")
+        return self.hierarchy
 
     def get_context(self) -> Dict[str, Any]:
         return self.yaml_config.get("context", {})
@@ -59,16 +79,44 @@ class Config:
     def __init__(self, yaml_config: Dict[str, Any]) -> None:
         super().__init__()
         self.yaml_config = yaml_config
+        self.services: Optional[List[ServiceConfig]] = None
 
     def get_services(self) -> List[ServiceConfig]:
-        return [ServiceConfig(service) for service in self.yaml_config["services"]]
+        """Parsed once, every caller shares the same service and sensor configurations."""
+        if self.services is None:
+            self.services = [ServiceConfig(service) for service in self.yaml_config["services"]]
+        return self.services
 
     def get_title(self):
         return self.yaml_config.get("title", "Service Monitoring App")
 
+    def get_cache_ttl_seconds(self) -> int:
+        return self.yaml_config.get("cache_ttl_seconds", 600)
+
+    def get_max_concurrent_requests(self) -> int:
+        return self.yaml_config.get("max_concurrent_requests", 8)
+
+    def get_max_service_panels(self) -> int:
+        return self.yaml_config.get("max_service_panels", 20)
+
+    def get_metrics_file(self) -> Optional[str]:
+        return self.yaml_config.get("metrics_file", None)
+
+    def get_metrics_export_seconds(self) -> int:
+        return self.yaml_config.get("metrics_export_seconds", 15)
+
+    def get_history_file(self) -> Optional[str]:
+        return self.yaml_config.get("history_file", None)
+
+    def get_history_max_age_seconds(self) -> int:
+        return self.yaml_config.get("history_max_age_seconds", 86400)
+
+    def get_history_max_rows(self) -> int:
+        return self.yaml_config.get("history_max_rows", 1000)
+
 
 def read_config(path: str = os.getenv("CONFIG_FILE_PATH", default="config.yaml")) -> Config:
     with open(path) as file:
-        yaml_config = yaml.load(file, Loader=yaml.FullLoader)
+        yaml_config = yaml.load(file, Loader=YamlLoader)
     return Config(yaml_config)
 
@@ -1,4 +1,6 @@
-from typing import Type
+import argparse
+import asyncio
+from typing import Optional, Type
 
 from textual.app import App, ComposeResult, CSSPathType
 from textual.containers import Container, Vertical
@@ -7,8 +9,15 @@ from textual.reactive import var
 from textual.widgets import Header, Footer
 
 from components.service.service_content import ServiceContent
+from components.service.service_search import ServiceSearch
 from components.service.service_tree import ServiceTree
-from config.config import read_config
+from config.config import read_config, ServiceConfig, Config
+from sensors.backend_traffic import traffic
+from sensors.fetch_scheduler import scheduler
+from sensors.history_store import HistoryStore
+from sensors.metrics import metrics
+from sensors.polling_engine import polling_engine, PollingEngine
+from sensors.sensor_resolver import close_sensor_clients
 
 
 class ServiceStatusApp(App):
@@ -18,6 +27,7 @@ class ServiceStatusApp(App):
     BINDINGS = [
         ("d", "toggle_dark", "Toggle dark mode"),
         ("s", "toggle_services", "Toggle Services"),
+        ("/", "search", "Search"),
         ("q", "quit", "Quit"),
     ]
 
@@ -26,10 +36,16 @@ class ServiceStatusApp(App):
     def __init__(self,
                  driver_class: Type[Driver] | None = None,
                  css_path: CSSPathType | None = None,
-                 watch_css: bool = False):
+                 watch_css: bool = False,
+                 engine: Optional[PollingEngine] = None):
         super().__init__(driver_class, css_path, watch_css)
         self.config = read_config()
         self.title = self.config.get_title()
+        self.polling_engine = engine if engine is not None else polling_engine
+        self.polling_engine.cache.ttl_seconds = self.config.get_cache_ttl_seconds()
+        scheduler.max_concurrent_requests = self.config.get_max_concurrent_requests()
+        if engine is None:
+            open_history_store(self.polling_engine, self.config)
 
     def watch_show_tree(self, show_tree: bool) -> None:
         """Called when show_tree is modified."""
@@ -39,21 +55,51 @@ class ServiceStatusApp(App):
         """Create child widgets for the app."""
         yield Header(show_clock=True)
         yield Container(
-            Vertical(ServiceTree(self.config.get_services()), id="tree-view"),
-            Vertical(ServiceContent(self.config, id="content-view"))
+            Vertical(ServiceSearch(self.config.get_services()), ServiceTree(self.config.get_services()),
+                     id="tree-view"),
+            Vertical(ServiceContent(self.config, self.polling_engine, id="content-view"))
         )
         yield Footer()
 
     def on_mount(self) -> None:
         self.query_one(ServiceTree).focus()
         self.query_one(Header).tall = True
+        if self.config.get_metrics_file() is not None:
+            self.set_interval(self.config.get_metrics_export_seconds(), self.export_metrics)
+
+    async def on_unmount(self) -> None:
+        self.polling_engine.close()
+        await close_sensor_clients()
+        traffic.close()
+        self.export_metrics()
+
+    def export_metrics(self) -> None:
+        """Write the app's own metrics for a node_exporter textfile collector, if a metrics file is configured."""
+        if self.config.get_metrics_file() is not None:
+            metrics.write_text_file(self.config.get_metrics_file())
 
     def on_service_tree_selected(self, message: ServiceTree.Selected) -> None:
         """Called when a non group is selected in the service tree."""
         message.stop()
-        self.sub_title = message.service.name
+        self.select_service(message.service.service_config)
+
+    def on_service_search_matched(self, message: ServiceSearch.Matched) -> None:
+        """Called when the current match of the search changes."""
+        message.stop()
+        self.query_one(ServiceTree).show_service(message.service)
+
+    def on_service_search_selected(self, message: ServiceSearch.Selected) -> None:
+        """Called when a match of the search is chosen."""
+        message.stop()
+        service_tree = self.query_one(ServiceTree)
+        service_tree.show_service(message.service)
+        service_tree.focus()
+        self.select_service(message.service)
+
+    def select_service(self, service: ServiceConfig) -> None:
+        self.sub_title = service.get_name()
         service_info = self.query_one(ServiceContent)
-        service_info.update_selected_service(message.service.service_config)
+        service_info.update_selected_service(service)
 
     def action_toggle_dark(self) -> None:
         """Called in response to key binding to toggle dark mode."""
@@ -63,7 +109,65 @@ class ServiceStatusApp(App):
         """Called in response to key binding to toggle service tree."""
         self.show_tree = not self.show_tree
 
+    def action_search(self) -> None:
+        """Called in response to key binding to search for a service."""
+        self.show_tree = True
+        self.query_one(ServiceSearch).focus()
+
+
+def open_history_store(engine: PollingEngine, config: Config) -> None:
+    """Keep the readings of the engine's fetches on disk, if a history file is configured."""
+    if config.get_history_file() is not None and engine.store is None:
+        engine.store = HistoryStore(config.get_history_file(), config.get_history_max_age_seconds(),
+                                    config.get_history_max_rows())
+
+
+def run_collector(socket_path: str) -> None:
+    """Poll sensors for attached apps without a ui, sharing each poll between every app viewing its sensor."""
+    from sensors.collector.collector_server import Collector
+
+    config = read_config()
+    polling_engine.cache.ttl_seconds = config.get_cache_ttl_seconds()
+    scheduler.max_concurrent_requests = config.get_max_concurrent_requests()
+    open_history_store(polling_engine, config)
+    try:
+        asyncio.run(Collector(polling_engine, socket_path, config).serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        traffic.close()
+
+
+def attach_collector(socket_path: str) -> PollingEngine:
+    from sensors.collector.collector_client import CollectorConnection, RemotePollingEngine
+
+    return RemotePollingEngine(CollectorConnection(socket_path))
+
 
 if __name__ == "__main__":
-    app = ServiceStatusApp()
-    app.run()
+    from sensors.collector.collector_protocol import DEFAULT_SOCKET_PATH
+
+    parser = argparse.ArgumentParser(description="Monitor services in the terminal")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--collector", action="store_true", help="poll sensors for attached apps, without a ui")
+    mode.add_argument("--attach", action="store_true", help="show sensors polled by a running collector")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="unix socket of the collector")
+    traffic_mode = parser.add_mutually_exclusive_group()
+    traffic_mode.add_argument("--record", metavar="FILE",
+                              help="record the requests and responses of prometheus and search sensors to a gzip file")
+    traffic_mode.add_argument("--replay", metavar="FILE",
+                              help="answer prometheus and search sensors from a recording rather than their backends")
+    parser.add_argument("--replay-fast", action="store_true",
+                        help="replay responses as fast as possible rather than taking as long as when recorded")
+    args = parser.parse_args()
+
+    if args.record is not None:
+        traffic.record(args.record)
+    elif args.replay is not None:
+        traffic.replay(args.replay, original_timing=not args.replay_fast)
+
+    if args.collector:
+        run_collector(args.socket)
+    else:
+        app = ServiceStatusApp(engine=attach_collector(args.socket) if args.attach else None)
+        app.run()
@@ -0,0 +1,176 @@
+import asyncio
+import gzip
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+# parameters of prometheus queries which move with the time of each poll
+TIME_PARAMS = {"time", "start", "end"}
+
+FLUSH_INTERVAL_SECONDS = 5
+
+NO_RECORDED_RESPONSE = "no_recorded_response"
+
+
+class Exchange(NamedTuple):
+    payload: str
+    status: int
+    duration: float
+
+
+class TrafficRecorder:
+    """Appends every exchange with a backend to a gzip compressed file of json lines, stamped with the time it ended.
+
+    Exchanges are encoded and compressed by a thread of the recorder, which flushes the file once the exchanges
+    written to it are flush_interval_seconds old, so a crash loses at most the exchanges of the last interval.
+    """
+
+    def __init__(self, path: str, flush_interval_seconds: float = FLUSH_INTERVAL_SECONDS) -> None:
+        super().__init__()
+        self.file = gzip.open(path, "wt", encoding="utf-8", compresslevel=1)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.records: queue.Queue[Optional[Dict[str, Any]]] = queue.Queue()
+        self.writer = threading.Thread(target=self.write_queued, name="monitor-tui-recorder", daemon=True)
+        self.writer.start()
+
+    def record(self, url: str, kind: str, request: Any, payload: str | bytes, status: int, duration: float) -> None:
+        self.records.put({"time": time.time(), "url": url, "kind": kind, "request": request,
+                          "status": status, "duration": duration, "payload": payload})
+
+    def write_queued(self) -> None:
+        unflushed_since: Optional[float] = None
+        while True:
+            try:
+                timeout = None if unflushed_since is None else \
+                    max(0.0, unflushed_since + self.flush_interval_seconds - time.monotonic())
+                record = self.records.get(timeout=timeout)
+            except queue.Empty:
+                self.file.flush()
+                unflushed_since = None
+                continue
+            if record is None:
+                break
+            if isinstance(record["payload"], bytes):
+                record["payload"] = record["payload"].decode("utf-8", "replace")
+            self.file.write(json.dumps(record) + "\n")
+            if unflushed_since is None:
+                unflushed_since = time.monotonic()
+        self.file.close()
+
+    def close(self) -> None:
+        """Write the queued exchanges and close the file."""
+        self.records.put(None)
+        self.writer.join()
+
+
+class TrafficReplayer:
+    """Answers the requests of backend clients with the responses recorded for them, in the order they were recorded.
+
+    Requests are matched without their time range, so the polls of range queries and tailing searches are answered by
+    the next recorded poll. Once the responses of a request are used up its last one is repeated. Each response takes
+    as long as it took when recorded, unless replayed as fast as possible. The time between requests is not replayed,
+    requests are sent as the replaying app polls, so a recording made at other poll intervals is replayed at the
+    replaying app's intervals.
+
+    A recording cut short, e.g. by a crash of the recording app, is replayed up to its last flushed exchange.
+    """
+
+    def __init__(self, path: str, original_timing: bool = True) -> None:
+        super().__init__()
+        self.original_timing = original_timing
+        self.exchanges: Dict[str, Deque[Exchange]] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    self.load(json.loads(line))
+            except (EOFError, ValueError):
+                # the recording ends in its last flush, the line written after it may be incomplete
+                pass
+
+    def load(self, record: Dict[str, Any]) -> None:
+        if record["kind"] == "msearch":
+            self.load_searches(record)
+        else:
+            key = self.get_query_key(record["url"], record["request"])
+            self.add(key, Exchange(record["payload"], record["status"], record["duration"]))
+
+    def load_searches(self, record: Dict[str, Any]) -> None:
+        """Split an _msearch into the response of each of its searches, which are batched anew when replayed."""
+        try:
+            responses = json.loads(record["payload"]).get("responses", [])
+        except ValueError:
+            return
+        searches = record["request"]["searches"]
+        for header, body, response in zip(searches[::2], searches[1::2], responses):
+            key = self.get_search_key(record["url"], header, body)
+            self.add(key, Exchange(json.dumps(response), record["status"], record["duration"]))
+
+    def add(self, key: str, exchange: Exchange) -> None:
+        self.exchanges.setdefault(key, deque()).append(exchange)
+
+    def next_exchange(self, key: str) -> Optional[Exchange]:
+        exchanges = self.exchanges.get(key)
+        if not exchanges:
+            return None
+        return exchanges.popleft() if len(exchanges) > 1 else exchanges[0]
+
+    async def replay_query(self, url: str, request: Dict[str, Any]) -> Tuple[str, int]:
+        """Payload and status recorded for a prometheus query."""
+        exchange = self.next_exchange(self.get_query_key(url, request))
+        if exchange is None:
+            return json.dumps({"status": "error", "error": NO_RECORDED_RESPONSE}), 404
+        await self.wait(exchange.duration)
+        return exchange.payload, exchange.status
+
+    async def replay_searches(self, url: str, searches: List[Dict[str, Any]]) -> str:
+        """Payload of an _msearch made of the responses recorded for each of the searches."""
+        exchanges = [self.next_exchange(self.get_search_key(url, header, body))
+                     for header, body in zip(searches[::2], searches[1::2])]
+        missing = json.dumps({"status": 404, "error": {"type": NO_RECORDED_RESPONSE}})
+        await self.wait(max((exchange.duration for exchange in exchanges if exchange is not None), default=0))
+        return '{"responses":[' + ",".join(exchange.payload if exchange is not None else missing
+                                           for exchange in exchanges) + "]}"
+
+    async def wait(self, duration: float) -> None:
+        if self.original_timing:
+            await asyncio.sleep(duration)
+
+    @staticmethod
+    def get_query_key(url: str, request: Dict[str, Any]) -> str:
+        params = {key: value for key, value in request["params"].items() if key not in TIME_PARAMS}
+        return json.dumps([url, request["endpoint"], params], sort_keys=True)
+
+    @staticmethod
+    def get_search_key(url: str, header: Dict[str, Any], body: Dict[str, Any]) -> str:
+        """Key of a search without the range filter by which tailing searches continue after the newest document."""
+        query = body.get("query", {}).get("bool", {})
+        if "filter" in query:
+            body = body | {"query": {"bool": {key: value for key, value in query.items() if key != "filter"}}}
+        return json.dumps([url, header, body], sort_keys=True)
+
+
+class BackendTraffic:
+    """Records the exchanges of the prometheus and search clients with their backends, or replays a recording
+    in place of the backends."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.recorder: Optional[TrafficRecorder] = None
+        self.replayer: Optional[TrafficReplayer] = None
+
+    def record(self, path: str) -> None:
+        self.recorder = TrafficRecorder(path)
+
+    def replay(self, path: str, original_timing: bool = True) -> None:
+        self.replayer = TrafficReplayer(path, original_timing)
+
+    def close(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+
+traffic = BackendTraffic()
@@ -0,0 +1,85 @@
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+FAILURE_THRESHOLD = 3
+BASE_BACKOFF_SECONDS = 5
+MAX_BACKOFF_SECONDS = 300
+
+T = TypeVar("T")
+
+
+class CircuitOpenException(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Stops requests to a failing backend, retrying it with a single probe after an exponentially growing backoff."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, base_backoff_seconds: float = BASE_BACKOFF_SECONDS,
+                 max_backoff_seconds: float = MAX_BACKOFF_SECONDS) -> None:
+        super().__init__()
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.backoff_seconds = 0.0
+        self.probing = False
+
+    def get_state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() < self.opened_at + self.backoff_seconds:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        """Closed circuits allow every request, half open circuits only a single probe at a time."""
+        match self.get_state():
+            case "closed":
+                return True
+            case "half_open" if not self.probing:
+                self.probing = True
+                return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.backoff_seconds = 0.0
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probing = False
+        if self.failures >= self.failure_threshold:
+            backoff_seconds = self.base_backoff_seconds * 2 ** (self.failures - self.failure_threshold)
+            # jitter keeps a recovering backend from being probed by every client at once
+            self.backoff_seconds = random.uniform(0.5, 1) * min(self.max_backoff_seconds, backoff_seconds)
+            self.opened_at = time.time()
+
+    async def call(self, request: Callable[[], Awaitable[T]], is_failure: Callable[[BaseException], bool]) -> T:
+        """Await the request unless the circuit is open, exceptions for which is_failure holds count as failures of
+        the backend, others, e.g. those of a malformed request, neither open nor close the circuit."""
+        if not self.allow_request():
+            raise CircuitOpenException(f"circuit {self.get_state()}, {self.failures} consecutive failures")
+        try:
+            result = await request()
+        except BaseException as request_exception:
+            if is_failure(request_exception):
+                self.record_failure()
+            else:
+                self.probing = False
+            raise
+        self.record_success()
+        return result
+
+
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(url: str) -> CircuitBreaker:
+    if url not in breakers:
+        breakers[url] = CircuitBreaker()
+    return breakers[url]
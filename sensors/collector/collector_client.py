@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+from typing import Any, Dict, Iterable, Hashable, Optional
+
+from rich.console import RenderableType
+
+from config.config import SensorConfig
+from sensors.collector.collector_protocol import LINE_LIMIT, encode_message, decode_message
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, current_priority
+from sensors.polling_engine import PollingEngine, Subscription, SensorCallback
+from sensors.sensor import Sensor, SensorReading, decode_readings
+from sensors.sensor_cache import SensorCache
+
+CONNECT_TIMEOUT_SECONDS = 10
+REQUEST_TIMEOUT_SECONDS = 60
+MAX_RECONNECT_WAIT_SECONDS = 30
+
+
+class RemoteSubscription(Subscription):
+    """A subscription held by the collector, readings are pushed by the collector rather than fetched."""
+
+    def __init__(self, connection: "CollectorConnection", subscription_id: int, message: Dict[str, Any],
+                 callback: SensorCallback, poll_wait_seconds: int) -> None:
+        super().__init__(None, callback, poll_wait_seconds)
+        self.connection = connection
+        self.subscription_id = subscription_id
+        self.message = message
+
+    def pause(self) -> None:
+        self.active = False
+        self.connection.send({"type": "pause", "id": self.subscription_id})
+
+    def resume(self) -> None:
+        self.active = True
+        self.connection.send({"type": "resume", "id": self.subscription_id})
+
+    def set_priority(self, priority: int) -> None:
+        if priority != self.priority:
+            self.priority = priority
+            self.connection.send({"type": "priority", "id": self.subscription_id, "priority": priority})
+
+    def cancel(self) -> None:
+        self.active = False
+        self.connection.unsubscribe(self)
+
+
+class CollectorConnection:
+    """Connection to a collector, reconnecting and restoring every subscription whenever it is lost."""
+
+    def __init__(self, socket_path: str) -> None:
+        super().__init__()
+        self.socket_path = socket_path
+        self.ids = itertools.count(1)
+        self.subscriptions: Dict[int, RemoteSubscription] = {}
+        self.requests: Dict[int, asyncio.Future] = {}
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connected = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        reconnect_wait_seconds = 1
+        while True:
+            try:
+                reader, self.writer = await asyncio.open_unix_connection(self.socket_path, limit=LINE_LIMIT)
+            except OSError:
+                await asyncio.sleep(reconnect_wait_seconds)
+                reconnect_wait_seconds = min(MAX_RECONNECT_WAIT_SECONDS, reconnect_wait_seconds * 2)
+                continue
+            reconnect_wait_seconds = 1
+            for subscription in list(self.subscriptions.values()):
+                self.send(subscription.message)
+                if not subscription.active:
+                    self.send({"type": "pause", "id": subscription.subscription_id})
+                if subscription.priority != PRIORITY_BACKGROUND:
+                    self.send({"type": "priority", "id": subscription.subscription_id,
+                               "priority": subscription.priority})
+            self.connected.set()
+            try:
+                while line := await reader.readline():
+                    self.dispatch(decode_message(line))
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                self.disconnect()
+
+    def disconnect(self) -> None:
+        self.connected.clear()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        for future in self.requests.values():
+            if not future.done():
+                future.set_exception(ConnectionError("collector connection lost"))
+        self.requests.clear()
+
+    def dispatch(self, message: Dict[str, Any]) -> None:
+        if message["id"] in self.subscriptions:
+            self.subscriptions[message["id"]].deliver(decode_readings(message["readings"]), message["fetched_at"])
+        elif message["id"] in self.requests:
+            future = self.requests.pop(message["id"])
+            if not future.done():
+                future.set_result(message)
+
+    def send(self, message: Dict[str, Any]) -> None:
+        """Messages sent while disconnected are dropped, the state of subscriptions is restored on reconnect."""
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(encode_message(message))
+
+    def subscribe(self, message: Dict[str, Any], callback: SensorCallback, poll_wait_seconds: int) -> Subscription:
+        self.start()
+        subscription_id = next(self.ids)
+        message = message | {"type": "subscribe", "id": subscription_id, "poll_wait_seconds": poll_wait_seconds}
+        subscription = RemoteSubscription(self, subscription_id, message, callback, poll_wait_seconds)
+        self.subscriptions[subscription_id] = subscription
+        self.send(message)
+        return subscription
+
+    def unsubscribe(self, subscription: RemoteSubscription) -> None:
+        if self.subscriptions.pop(subscription.subscription_id, None) is not None:
+            self.send({"type": "cancel", "id": subscription.subscription_id})
+
+    async def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.start()
+        try:
+            await asyncio.wait_for(self.connected.wait(), CONNECT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"no collector listening on {self.socket_path}")
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.requests[request_id] = future
+        self.send(message | {"id": request_id})
+        try:
+            return await asyncio.wait_for(future, REQUEST_TIMEOUT_SECONDS)
+        finally:
+            self.requests.pop(request_id, None)
+
+    def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.disconnect()
+
+
+class RemoteSensor(Sensor):
+    """A sensor fetched by the collector, the locally resolved sensor only describes its fields and request."""
+
+    def __init__(self, connection: CollectorConnection, sensor_config: SensorConfig, context: Dict[str, Any],
+                 sensor: Sensor) -> None:
+        super().__init__()
+        self.connection = connection
+        self.sensor_config = sensor_config
+        self.context = context
+        self.sensor = sensor
+
+    def get_sensor_fields(self) -> Iterable[RenderableType]:
+        return self.sensor.get_sensor_fields()
+
+    def get_request_key(self) -> Hashable:
+        return self.sensor.get_request_key()
+
+    def get_message(self) -> Dict[str, Any]:
+        return {"sensor": self.sensor_config.yaml_config, "context": self.context}
+
+    async def fetch_sensor_history(self, start: float, end: float, step: float) -> Iterable[SensorReading]:
+        try:
+            response = await self.connection.request(
+                self.get_message() | {"type": "history", "start": start, "end": end, "step": step,
+                                      "priority": current_priority.get()})
+        except (ConnectionError, asyncio.TimeoutError):
+            return []
+        return decode_readings(response.get("readings", []))
+
+    async def fetch_sensor_details(self, key: str) -> Optional[RenderableType]:
+        try:
+            response = await self.connection.request(
+                self.get_message() | {"type": "details", "key": key, "priority": current_priority.get()})
+        except (ConnectionError, asyncio.TimeoutError) as request_exception:
+            return str(request_exception) or str(type(request_exception).__name__)
+        return response.get("error", response.get("details"))
+
+
+class RemotePollingEngine(PollingEngine):
+    """Subscribes sensors at a collector instead of polling them, so any number of apps share the collector's polls."""
+
+    def __init__(self, connection: CollectorConnection) -> None:
+        super().__init__(SensorCache())
+        self.connection = connection
+
+    def resolve_sensor(self, sensor_config: SensorConfig, context: Dict[str, Any]) -> Sensor:
+        return RemoteSensor(self.connection, sensor_config, context, super().resolve_sensor(sensor_config, context))
+
+    def subscribe(self, sensor: Sensor, poll_wait_seconds: int, callback: SensorCallback) -> Subscription:
+        return self.connection.subscribe(sensor.get_message(), callback, poll_wait_seconds)
+
+    def close(self) -> None:
+        self.connection.close()
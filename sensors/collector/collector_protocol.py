@@ -0,0 +1,29 @@
+import json
+import os
+from typing import Any, Dict
+
+
+def get_default_socket_path() -> str:
+    """A socket in the user's runtime directory, which other users cannot access, or one named after the user."""
+    if os.getenv("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "monitor-tui.sock")
+    return f"/tmp/monitor-tui-{os.getuid()}.sock"
+
+
+DEFAULT_SOCKET_PATH = os.getenv("COLLECTOR_SOCKET_PATH", default=get_default_socket_path())
+
+# a message is a single line of json, tables of many documents make for long lines
+LINE_LIMIT = 2 ** 26
+
+
+def get_sensor_id(sensor: Dict[str, Any], context: Dict[str, Any]) -> str:
+    """Identify the configuration of a sensor of a service, a collector only polls sensors of its own configuration."""
+    return json.dumps([sensor, context], sort_keys=True, default=str)
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, default=str).encode() + b"\n"
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    return json.loads(line)
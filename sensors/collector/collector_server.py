@@ -0,0 +1,135 @@
+import asyncio
+import os
+import signal
+import time
+from typing import Any, Dict, List, Set
+
+from config.config import Config, SensorConfig
+from sensors.collector.collector_protocol import LINE_LIMIT, encode_message, decode_message, get_sensor_id
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, prioritized
+from sensors.polling_engine import PollingEngine, Subscription
+from sensors.sensor import Sensor, SensorReading, encode_readings
+from sensors.sensor_resolver import close_sensor_clients
+
+# a client this far behind on reading its socket is disconnected, it resubscribes and catches up from the cache
+MAX_WRITE_BUFFER_BYTES = 2 ** 26
+
+
+class UnknownSensorException(Exception):
+    """A client asked for a sensor which is not part of the collector's configuration."""
+
+
+class CollectorSession:
+    """Subscriptions of a single attached client, identified by the ids the client chose for them."""
+
+    def __init__(self, engine: PollingEngine, writer: asyncio.StreamWriter, sensor_ids: Set[str]) -> None:
+        super().__init__()
+        self.engine = engine
+        self.writer = writer
+        self.sensor_ids = sensor_ids
+        self.subscriptions: Dict[int, Subscription] = {}
+        self.tasks: Set[asyncio.Task] = set()
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        subscription_id = message["id"]
+        match message["type"]:
+            case "subscribe":
+                try:
+                    sensor = self.resolve_sensor(message)
+                except Exception as resolve_exception:
+                    self.send_readings(subscription_id, [SensorReading([str(resolve_exception)])], time.time())
+                    return
+                self.subscriptions[subscription_id] = self.engine.subscribe(
+                    sensor, message["poll_wait_seconds"],
+                    lambda readings, fetched_at: self.send_readings(subscription_id, readings, fetched_at))
+            case "pause" if subscription_id in self.subscriptions:
+                self.subscriptions[subscription_id].pause()
+            case "resume" if subscription_id in self.subscriptions:
+                self.subscriptions[subscription_id].resume()
+            case "cancel" if subscription_id in self.subscriptions:
+                self.subscriptions.pop(subscription_id).cancel()
+            case "priority" if subscription_id in self.subscriptions:
+                self.subscriptions[subscription_id].set_priority(message["priority"])
+            case "history" | "details":
+                with prioritized(message.get("priority", PRIORITY_BACKGROUND)):
+                    task = asyncio.create_task(self.reply(message))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    def resolve_sensor(self, message: Dict[str, Any]) -> Sensor:
+        """Resolve a sensor of the collector's configuration, any other would query urls of the client's choosing
+        with the collector's credentials."""
+        if get_sensor_id(message["sensor"], message["context"]) not in self.sensor_ids:
+            raise UnknownSensorException(f"sensor {message['sensor'].get('name')} is not configured at the collector")
+        return self.engine.resolve_sensor(SensorConfig(message["sensor"]), message["context"])
+
+    async def reply(self, message: Dict[str, Any]) -> None:
+        """Answer a one-off request of the client, which is served by a sensor of its own rather than a poll."""
+        try:
+            sensor = self.resolve_sensor(message)
+            if message["type"] == "history":
+                readings = await self.engine.fetch_history(sensor, message["start"], message["end"], message["step"])
+                self.send({"id": message["id"], "readings": encode_readings(readings)})
+            else:
+                self.send({"id": message["id"], "details": await sensor.fetch_sensor_details(message["key"])})
+        except Exception as request_exception:
+            self.send({"id": message["id"], "error": str(type(request_exception).__name__)})
+
+    def send_readings(self, subscription_id: int, readings: List[SensorReading], fetched_at: float) -> None:
+        self.send({"id": subscription_id, "readings": encode_readings(readings), "fetched_at": fetched_at})
+
+    def send(self, message: Dict[str, Any]) -> None:
+        if self.writer.is_closing():
+            return
+        self.writer.write(encode_message(message))
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER_BYTES:
+            self.writer.close()
+
+    def close(self) -> None:
+        for subscription in self.subscriptions.values():
+            subscription.cancel()
+        self.subscriptions.clear()
+        for task in list(self.tasks):
+            task.cancel()
+        self.writer.close()
+
+
+class Collector:
+    """Polls sensors for every client attached to its unix socket, clients polling the same request share a poll."""
+
+    def __init__(self, engine: PollingEngine, socket_path: str, config: Config) -> None:
+        super().__init__()
+        self.engine = engine
+        self.socket_path = socket_path
+        self.sensor_ids = {get_sensor_id(sensor_config.yaml_config, service.get_context())
+                           for service in config.get_services() for sensor_config in service.get_sensors()}
+
+    async def serve(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # only the collector's user may connect, others could have it poll its configured sensors on their behalf
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(self.handle_client, self.socket_path, limit=LINE_LIMIT)
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, server.close)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.engine.close()
+            await close_sensor_clients()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = CollectorSession(self.engine, writer, self.sensor_ids)
+        try:
+            while line := await reader.readline():
+                session.handle(decode_message(line))
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            session.close()
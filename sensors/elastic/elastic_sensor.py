@@ -1,79 +1,30 @@
 import asyncio
-from functools import reduce
-from typing import Any, Dict, Iterable
 
 import elasticsearch.exceptions
 from elasticsearch import AsyncElasticsearch
+from elasticsearch.serializer import JSONSerializer
 
 import config.config
-from sensors.sensor import Sensor, SensorReading, EMPTY_SENSOR_READING
+from sensors.measuring_serializer import MeasuringSerializer
+from sensors.search.search_sensor import SearchSensor
 
 clients: dict[str, AsyncElasticsearch] = {}
 
 
-class ElasticSensor(Sensor):
+class ElasticSerializer(MeasuringSerializer, JSONSerializer):
+    serialization_error = elasticsearch.exceptions.SerializationError
 
-    def __init__(self, sensor_configuration: Dict[str, Any], context: Dict[str, Any]):
-        super(ElasticSensor, self).__init__()
-        if sensor_configuration["url"] not in clients:
-            clients[sensor_configuration["url"]] = AsyncElasticsearch(sensor_configuration["url"])
-        self.client = clients[sensor_configuration["url"]]
-        self.context = context
-        self.result_fields = sensor_configuration["result_fields"]
 
-        self.query = self.format_json(sensor_configuration["query"], self.context)
-        self.sub_query = self.format_json(sensor_configuration.get("sub_query", None), self.context)
-        self.aggregation = self.format_json(sensor_configuration.get("aggregation", None), self.context)
-        self.sort = self.format_json(sensor_configuration.get("sort", None), self.context)
+class ElasticSensor(SearchSensor):
+    sensor_type = "elastic"
+    search_exception = elasticsearch.ElasticsearchException
+    connection_exception = elasticsearch.exceptions.ConnectionError
+    transport_exception = elasticsearch.exceptions.TransportError
 
-        self.args = {
-            "index": self.format_json(sensor_configuration["index_pattern"], self.context),
-            "size": self.format_json(sensor_configuration["max_hits"], self.context)
-        }
-
-        if self.sub_query is not None:
-            self.args["query"] = {"bool": {"must": [self.query, self.sub_query]}}
-        else:
-            self.args["query"] = {"bool": {"must": [self.query]}}
-        if self.sort is not None:
-            self.args["sort"] = sensor_configuration["sort"]
-        if self.aggregation is not None:
-            self.args["aggs"] = {"groups": self.aggregation}
-
-        self.reverse_results = sensor_configuration.get("reverse_results", False)
-
-    async def search(self):
-        return await self.client.search(**self.args)
-
-    def get_sensor_fields(self) -> Iterable[str]:
-        return self.result_fields
-
-    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
-        try:
-            results = await self.search()
-        except elasticsearch.ElasticsearchException as elastic_exception:
-            return [SensorReading([str(type(elastic_exception).__name__)])]
-
-        if self.aggregation is not None:
-            results = list(map(lambda result: result, results["aggregations"]["groups"]["buckets"]))
-            if not results:
-                return [EMPTY_SENSOR_READING]
-            results = map(lambda result: result["group_docs"]["hits"]["hits"], results)
-            results = reduce(lambda r1, r2: r1 + r2, results, [])
-            results = map(lambda result: result["_source"], results)
-        else:
-            results = map(lambda result: result["_source"], results.get("hits", {}).get("hits", []))
-
-        results = map(lambda result: SensorReading(self.strip_message(result), result), results)
-
-        if self.reverse_results:
-            results = list(results)
-            results.reverse()
-
-        return results
-
-    def strip_message(self, message: Dict[str, Any]) -> Iterable[str]:
-        return map(lambda result_field: str(message.get(result_field, "N/A")), self.result_fields)
+    def get_client(self, url: str) -> AsyncElasticsearch:
+        if url not in clients:
+            clients[url] = AsyncElasticsearch(url, serializer=ElasticSerializer(url))
+        return clients[url]
 
 
 if __name__ == '__main__':
@@ -0,0 +1,77 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+# lower priorities are let in first
+PRIORITY_VISIBLE = 0
+PRIORITY_SELECTED = 1
+PRIORITY_BACKGROUND = 2
+
+# priority of the requests made by the current task, set by the fetch of a polling job or the batch of a client
+current_priority: ContextVar[int] = ContextVar("current_priority", default=PRIORITY_BACKGROUND)
+
+
+@contextmanager
+def prioritized(priority: int) -> Iterator[None]:
+    """Make requests at a priority, including those of tasks started meanwhile."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class FetchScheduler:
+    """Limits the requests in flight to every backend url, requests waiting for one to finish are let in by priority.
+
+    Requests of equal priority are let in in the order they arrived.
+    """
+
+    def __init__(self, max_concurrent_requests: int = 8) -> None:
+        super().__init__()
+        self.max_concurrent_requests = max_concurrent_requests
+        self.in_flight: Dict[str, int] = {}
+        self.waiting: Dict[str, List[Tuple[int, int, asyncio.Future]]] = {}
+        self.sequence = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, url: str, priority: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold one of the url's slots for a request, by default at the priority of the current task."""
+        await self.acquire(url, priority if priority is not None else current_priority.get())
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    async def acquire(self, url: str, priority: int) -> None:
+        if self.in_flight.get(url, 0) < self.max_concurrent_requests and not self.waiting.get(url):
+            self.in_flight[url] = self.in_flight.get(url, 0) + 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiting.setdefault(url, []), (priority, next(self.sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # a slot handed over to a request cancelled before it could resume is passed on
+            if future.done() and not future.cancelled():
+                self.release(url)
+            raise
+
+    def release(self, url: str) -> None:
+        """Hand the slot over to the first waiting request, requests cancelled while waiting are skipped."""
+        waiting = self.waiting.get(url, [])
+        while waiting:
+            _, _, future = heapq.heappop(waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.waiting.pop(url, None)
+        self.in_flight[url] -= 1
+        if not self.in_flight[url]:
+            del self.in_flight[url]
+
+
+scheduler = FetchScheduler()
@@ -0,0 +1,111 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from sensors.sensor import SensorReading, encode_readings, decode_readings
+
+StoredReadings = Tuple[float, List[SensorReading]]
+StoreWrite = Tuple[str, List[SensorReading], float, Optional[Any]]
+
+
+class HistoryStore:
+    """Readings of every fetch kept in a local sqlite file, so a restarted app starts from its previous readings.
+
+    Readings are encoded and written by a thread of the store, which also drops rows older than max_age_seconds and
+    all but the newest max_rows rows of each sensor every prune_interval_seconds, keeping both off the event loop.
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 86400, max_rows: int = 1000,
+                 prune_interval_seconds: float = 60) -> None:
+        super().__init__()
+        self.max_age_seconds = max_age_seconds
+        self.max_rows = max_rows
+        self.prune_interval_seconds = prune_interval_seconds
+        self.pruned_at = 0.0
+        self.path = path
+        # reads of the event loop use their own connection, in write-ahead log mode they do not wait for writes
+        self.connection = self.connect()
+        self.connection.execute("CREATE TABLE IF NOT EXISTS readings "
+                                "(sensor_key TEXT NOT NULL, fetched_at REAL NOT NULL, readings TEXT NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS readings_by_sensor ON readings (sensor_key, fetched_at)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS high_water_marks "
+                                "(sensor_key TEXT PRIMARY KEY, high_water_mark TEXT NOT NULL)")
+        self.writes: queue.Queue[Optional[StoreWrite]] = queue.Queue()
+        self.writer = threading.Thread(target=self.write_queued, name="monitor-tui-history", daemon=True)
+        self.writer.start()
+
+    def connect(self) -> sqlite3.Connection:
+        # autocommit, in write-ahead log mode a commit does not wait for the disk
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def put(self, key: str, readings: List[SensorReading], fetched_at: float,
+            high_water_mark: Optional[Any] = None) -> None:
+        """Queue the readings of a fetch to be written by the store's thread."""
+        self.writes.put((key, readings, fetched_at, high_water_mark))
+
+    def flush(self) -> None:
+        """Wait until every queued write is written."""
+        self.writes.join()
+
+    def write_queued(self) -> None:
+        connection = self.connect()
+        while True:
+            if time.time() - self.pruned_at >= self.prune_interval_seconds:
+                self.prune(connection)
+            try:
+                write = self.writes.get(timeout=self.prune_interval_seconds)
+            except queue.Empty:
+                continue
+            try:
+                if write is None:
+                    break
+                self.write(connection, *write)
+            finally:
+                self.writes.task_done()
+        connection.close()
+
+    @staticmethod
+    def write(connection: sqlite3.Connection, key: str, readings: List[SensorReading], fetched_at: float,
+              high_water_mark: Optional[Any]) -> None:
+        connection.execute("INSERT INTO readings VALUES (?, ?, ?)",
+                           (key, fetched_at, json.dumps(encode_readings(readings), default=str)))
+        if high_water_mark is not None:
+            connection.execute("INSERT OR REPLACE INTO high_water_marks VALUES (?, ?)",
+                               (key, json.dumps(high_water_mark, default=str)))
+
+    def get_latest(self, key: str) -> Optional[StoredReadings]:
+        row = self.connection.execute("SELECT fetched_at, readings FROM readings WHERE sensor_key = ? "
+                                      "ORDER BY fetched_at DESC LIMIT 1", (key,)).fetchone()
+        return (row[0], decode_readings(json.loads(row[1]))) if row is not None else None
+
+    def get_since(self, key: str, start: float) -> List[StoredReadings]:
+        """Readings of every fetch at or after a unix timestamp, oldest first."""
+        rows = self.connection.execute("SELECT fetched_at, readings FROM readings WHERE sensor_key = ? "
+                                       "AND fetched_at >= ? ORDER BY fetched_at", (key, start)).fetchall()
+        return [(fetched_at, decode_readings(json.loads(readings))) for fetched_at, readings in rows]
+
+    def get_high_water_mark(self, key: str) -> Optional[Any]:
+        row = self.connection.execute("SELECT high_water_mark FROM high_water_marks WHERE sensor_key = ?",
+                                      (key,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def prune(self, connection: sqlite3.Connection) -> None:
+        self.pruned_at = time.time()
+        connection.execute("DELETE FROM readings WHERE fetched_at < ?", (self.pruned_at - self.max_age_seconds,))
+        connection.execute("DELETE FROM readings WHERE rowid IN (SELECT rowid FROM "
+                           "(SELECT rowid, ROW_NUMBER() OVER (PARTITION BY sensor_key ORDER BY fetched_at DESC) "
+                           "AS row_number FROM readings) WHERE row_number > ?)", (self.max_rows,))
+        connection.execute("DELETE FROM high_water_marks WHERE sensor_key NOT IN "
+                           "(SELECT DISTINCT sensor_key FROM readings)")
+
+    def close(self) -> None:
+        """Write the queued readings and close the store."""
+        self.writes.put(None)
+        self.writer.join()
+        self.connection.close()
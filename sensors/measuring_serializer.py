@@ -0,0 +1,30 @@
+from typing import Any, Type
+
+from sensors.metrics import metrics
+from sensors.worker_pool import RawResponse, is_offloaded, loads
+
+
+class MeasuringSerializer:
+    """Records the size of every response body of a cluster, leaving large ones to be decoded by the worker pool.
+
+    Mixed into the json serializer of a search client library, which raises its serialization_error for bodies
+    that cannot be decoded.
+    """
+
+    serialization_error: Type[Exception] = ValueError
+
+    def __init__(self, url: str) -> None:
+        super().__init__()
+        self.url = url
+
+    def loads(self, s: Any) -> Any:
+        metrics.observe("backend_response_bytes", {"url": self.url}, len(s))
+        if is_offloaded(s):
+            return RawResponse(s, self.decode)
+        return super().loads(s)
+
+    def decode(self, s: Any) -> Any:
+        try:
+            return loads(s)
+        except (ValueError, TypeError) as decode_exception:
+            raise self.serialization_error(s, decode_exception)
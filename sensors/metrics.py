@@ -0,0 +1,152 @@
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7, 1e8)
+COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# every metric of a name shares its buckets, so histograms of a name can be merged and exported alike
+METRIC_BUCKETS: Dict[str, Tuple[float, ...]] = {
+    "sensor_fetch_seconds": LATENCY_BUCKETS,
+    "backend_request_seconds": LATENCY_BUCKETS,
+    "backend_response_bytes": SIZE_BUCKETS,
+    "widget_update_seconds": LATENCY_BUCKETS,
+    "sensor_stream_batch_size": COUNT_BUCKETS,
+}
+
+EXPORT_PREFIX = "monitor_tui_"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Counts observations into cumulative-exportable buckets, which is all the bookkeeping done per observation."""
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        super().__init__()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.last = value
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        self.last = other.last
+
+    def get_mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def get_quantile(self, quantile: float) -> float:
+        """Estimate a quantile by interpolating within its bucket, the way prometheus' histogram_quantile does."""
+        if not self.count:
+            return 0.0
+        rank = quantile * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+        return self.max
+
+    def get_statistic(self, statistic: str) -> float:
+        match statistic:
+            case "count":
+                return self.count
+            case "sum":
+                return self.sum
+            case "mean":
+                return self.get_mean()
+            case "max":
+                return self.max
+            case "last":
+                return self.last
+            case _ if statistic.startswith("p"):
+                return self.get_quantile(float(statistic[1:]) / 100)
+        raise Exception(f"Unhandled statistic: {statistic}")
+
+
+class MetricsRegistry:
+    """Histograms of the app's own fetches and renders, keyed by metric name and labels."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        key = name, tuple(sorted(labels.items()))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(METRIC_BUCKETS.get(name, LATENCY_BUCKETS))
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, labels: Dict[str, str]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, labels, time.perf_counter() - start)
+
+    def find(self, name: Optional[str] = None, labels: Optional[Dict[str, str]] = None) -> List[Tuple[str, Labels, Histogram]]:
+        """Histograms of the given name, or of every name, whose labels include the given ones."""
+        labels = set((labels or {}).items())
+        return [(metric_name, metric_labels, histogram)
+                for (metric_name, metric_labels), histogram in sorted(self.histograms.items())
+                if (name is None or metric_name == name) and labels.issubset(metric_labels)]
+
+    def merge(self, name: str, labels: Optional[Dict[str, str]] = None) -> Histogram:
+        merged = Histogram(METRIC_BUCKETS.get(name, LATENCY_BUCKETS))
+        for _, _, histogram in self.find(name, labels):
+            merged.merge(histogram)
+        return merged
+
+    def to_text(self) -> str:
+        """Render every histogram in the prometheus text exposition format."""
+        lines = []
+        exported_names = set()
+        for name, labels, histogram in self.find():
+            exported_name = EXPORT_PREFIX + name
+            if exported_name not in exported_names:
+                exported_names.add(exported_name)
+                lines.append(f"# TYPE {exported_name} histogram")
+            cumulative = 0
+            for bound, count in zip([*histogram.buckets, "+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{exported_name}_bucket{self.format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{exported_name}_sum{self.format_labels(labels)} {histogram.sum}")
+            lines.append(f"{exported_name}_count{self.format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_text_file(self, path: str) -> None:
+        """Replace the file at once, so a node_exporter textfile collector never reads a partial export."""
+        with open(f"{path}.tmp", "w") as file:
+            file.write(self.to_text())
+        os.replace(f"{path}.tmp", path)
+
+    @staticmethod
+    def format_labels(labels: Labels, **extra_labels: object) -> str:
+        pairs = [*labels, *extra_labels.items()]
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,78 @@
+from array import array
+from math import ceil
+
+from sensors.ring_buffer import RingBuffer
+
+
+class MinMaxSeries:
+    """History of a numeric series downsampled to a width by min/max bucketing.
+
+    Buckets are aligned on the absolute index of each value, so appending a value only updates the newest bucket
+    and reading the series costs time in proportion to its width rather than its history. Each bucket holding more
+    than a single value is drawn as its minimum and maximum in the order they occurred, keeping spikes visible.
+    """
+
+    def __init__(self, capacity: int, width: int = 0) -> None:
+        super().__init__()
+        self.history = RingBuffer(capacity)
+        self.appended = 0
+        self.resize(width)
+
+    def resize(self, width: int) -> None:
+        """Bucket the history for a new width, the only operation costing time in proportion to the history."""
+        self.width = width
+        # two cells per bucket, with one spare bucket for the oldest one, partially dropped from the history
+        self.bucket_size = max(1, ceil(self.history.capacity / (width // 2))) if width > 1 else 1
+        self.bucket_count = ceil(self.history.capacity / self.bucket_size) + 1
+        self.minimums = array("d", bytes(8 * self.bucket_count))
+        self.maximums = array("d", bytes(8 * self.bucket_count))
+        self.minimum_first = array("b", bytes(self.bucket_count))
+        self.counts = array("l", bytes(array("l").itemsize * self.bucket_count))
+        first = self.appended - len(self.history)
+        for i, value in enumerate(self.history.to_list()):
+            self.add_to_bucket(first + i, value)
+
+    def append(self, value: float) -> None:
+        self.history.append(value)
+        self.add_to_bucket(self.appended, value)
+        self.appended += 1
+
+    def add_to_bucket(self, index: int, value: float) -> None:
+        slot = (index // self.bucket_size) % self.bucket_count
+        if index % self.bucket_size == 0 or self.counts[slot] == 0:
+            self.minimums[slot] = self.maximums[slot] = value
+            self.minimum_first[slot] = 1
+            self.counts[slot] = 1
+            return
+        if value < self.minimums[slot]:
+            self.minimums[slot] = value
+            self.minimum_first[slot] = 0
+        elif value > self.maximums[slot]:
+            self.maximums[slot] = value
+            self.minimum_first[slot] = 1
+        self.counts[slot] += 1
+
+    def clear(self) -> None:
+        self.history.clear()
+        self.appended = 0
+        self.resize(self.width)
+
+    def to_array(self) -> array:
+        """Cells of the downsampled series from oldest to newest, at most width of them once it is known."""
+        if not self.history:
+            return array("d")
+        first_bucket = (self.appended - len(self.history)) // self.bucket_size
+        last_bucket = (self.appended - 1) // self.bucket_size
+        cells = array("d")
+        for bucket in range(first_bucket, last_bucket + 1):
+            slot = bucket % self.bucket_count
+            if self.counts[slot] == 1:
+                cells.append(self.minimums[slot])
+            elif self.minimum_first[slot]:
+                cells.extend((self.minimums[slot], self.maximums[slot]))
+            else:
+                cells.extend((self.maximums[slot], self.minimums[slot]))
+        return cells[-self.width:] if self.width > 0 else cells
+
+    def __len__(self) -> int:
+        return len(self.history)
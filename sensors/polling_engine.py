@@ -0,0 +1,316 @@
+import asyncio
+import random
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from config.config import SensorConfig
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, prioritized
+from sensors.history_store import HistoryStore
+from sensors.metrics import metrics
+from sensors.sensor import Sensor, SensorReading
+from sensors.sensor_cache import CachedReadings, SensorCache
+from sensors.sensor_resolver import resolve_sensor
+
+SensorCallback = Callable[[List[SensorReading], float], None]
+
+# readings of a stream buffered for delivery to its subscriptions before the stream is no longer read
+STREAM_QUEUE_SIZE = 1000
+
+
+class Subscription:
+    def __init__(self, job: "PollingJob", callback: SensorCallback, poll_wait_seconds: int) -> None:
+        super().__init__()
+        self.job = job
+        self.callback = callback
+        self.poll_wait_seconds = poll_wait_seconds
+        self.active = True
+        self.fetched_at: Optional[float] = None
+        self.published = 0
+        self.priority = PRIORITY_BACKGROUND
+
+    def set_priority(self, priority: int) -> None:
+        """Priority of the job's requests while the backend is busy, e.g. whether the sensor is shown on screen."""
+        self.priority = priority
+
+    def deliver(self, readings: List[SensorReading], fetched_at: float) -> None:
+        self.fetched_at = fetched_at
+        self.callback(readings, fetched_at)
+
+    def pause(self) -> None:
+        self.active = False
+        self.job.reschedule()
+
+    def resume(self) -> None:
+        self.active = True
+        if self.job.readings is not None and self.fetched_at != self.job.fetched_at:
+            readings, self.published = self.job.get_readings_since(self.published), self.job.published
+            self.deliver(readings, self.job.fetched_at)
+        self.job.reschedule()
+
+    def cancel(self) -> None:
+        self.active = False
+        self.job.unsubscribe(self)
+
+
+class PollingJob:
+    """Polls a single resolved sensor on behalf of every subscription sharing its request."""
+
+    def __init__(self, engine: "PollingEngine", key: Hashable, sensor: Sensor) -> None:
+        super().__init__()
+        self.engine = engine
+        self.key = key
+        self.sensor = sensor
+        self.subscriptions: List[Subscription] = []
+        self.readings: Optional[List[SensorReading]] = None
+        self.fetched_at: Optional[float] = None
+        # readings published by an incremental job, whose subscriptions are only delivered those they missed
+        self.published = 0
+        self.task: Optional[asyncio.Task] = None
+        self.task_poll_wait_seconds: Optional[int] = None
+        self.fetch_task: Optional[asyncio.Task] = None
+
+        cached = engine.load_cached(key, sensor)
+        if cached is not None:
+            self.readings, self.fetched_at = cached.readings, cached.fetched_at
+
+    def get_poll_wait_seconds(self) -> Optional[int]:
+        active = [subscription.poll_wait_seconds for subscription in self.subscriptions if subscription.active]
+        return min(active) if active else None
+
+    def get_priority(self) -> int:
+        active = [subscription.priority for subscription in self.subscriptions if subscription.active]
+        return min(active, default=PRIORITY_BACKGROUND)
+
+    def get_readings_since(self, published: int) -> List[SensorReading]:
+        """Readings published after the given count of them, all current readings of jobs that are not incremental."""
+        if not self.sensor.is_incremental():
+            return self.readings
+        return self.readings[max(0, len(self.readings) - (self.published - published)):]
+
+    def subscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.append(subscription)
+        subscription.published = self.published
+        if self.readings is not None:
+            subscription.deliver(self.readings, self.fetched_at)
+        self.reschedule()
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        if not self.subscriptions:
+            self.stop()
+            self.engine.remove_job(self)
+        else:
+            self.reschedule()
+
+    def reschedule(self) -> None:
+        """(Re)start polling at the shortest interval requested by an active subscription."""
+        poll_wait_seconds = self.get_poll_wait_seconds()
+        if self.task is not None and not self.task.done() and poll_wait_seconds == self.task_poll_wait_seconds:
+            return
+        self.stop()
+        if poll_wait_seconds is not None:
+            self.task = asyncio.create_task(self.poll(poll_wait_seconds))
+            self.task_poll_wait_seconds = poll_wait_seconds
+
+    def stop(self) -> None:
+        """Stop polling, a fetch already in flight still completes and refreshes the cache."""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+            self.task_poll_wait_seconds = None
+
+    def get_initial_delay(self, poll_wait_seconds: int) -> float:
+        """Readings younger than the poll interval are served as they are, older ones are revalidated at once."""
+        if self.fetched_at is None:
+            return 0
+        return max(0.0, self.fetched_at + poll_wait_seconds - time.time())
+
+    def get_tick_delay(self, poll_wait_seconds: int) -> float:
+        """Wait until the next tick of the job's schedule group, which is offset from other groups by a random phase."""
+        phase = self.engine.get_phase(self.sensor.get_schedule_key()) * poll_wait_seconds
+        delay = (phase - time.time()) % poll_wait_seconds
+        return delay + poll_wait_seconds if delay < poll_wait_seconds / 2 else delay
+
+    async def poll(self, poll_wait_seconds: int) -> None:
+        await asyncio.sleep(self.get_initial_delay(poll_wait_seconds))
+        while True:
+            await asyncio.shield(self.start_fetch())
+            await asyncio.sleep(self.get_tick_delay(poll_wait_seconds))
+
+    def start_fetch(self) -> asyncio.Task:
+        if self.fetch_task is None or self.fetch_task.done():
+            self.fetch_task = asyncio.create_task(self.fetch())
+        return self.fetch_task
+
+    async def fetch(self) -> None:
+        """Fetch and publish the readings, an unexpected failure is published as a reading rather than ending polls."""
+        with metrics.timer("sensor_fetch_seconds", self.sensor.get_metric_labels()), prioritized(self.get_priority()):
+            try:
+                readings = list(await self.sensor.fetch_sensor_data())
+            except Exception as fetch_exception:
+                readings = [SensorReading([str(type(fetch_exception).__name__)])]
+        self.publish(readings)
+
+    def publish(self, readings: List[SensorReading]) -> None:
+        """Cache and store the readings and deliver them to every active subscription.
+
+        The readings of incremental jobs are added to those of their previous fetches, up to the sensor's maximum, so
+        subscriptions starting later are delivered all of them rather than only the latest fetch's.
+        """
+        if self.sensor.is_incremental():
+            self.readings = ((self.readings or []) + readings)[-self.sensor.get_max_readings():]
+            self.published += len(readings)
+        else:
+            self.readings = readings
+        self.fetched_at = time.time()
+        self.engine.cache.put(self.key, self.readings, self.fetched_at, self.sensor.get_high_water_mark())
+        self.engine.store_readings(self.sensor, readings, self.fetched_at)
+        for subscription in list(self.subscriptions):
+            if subscription.active:
+                subscription.published = self.published
+                subscription.deliver(readings, self.fetched_at)
+
+    def close(self) -> None:
+        self.stop()
+        if self.fetch_task is not None:
+            self.fetch_task.cancel()
+            self.fetch_task = None
+
+
+class StreamingJob(PollingJob):
+    """Streams a single resolved sensor on behalf of every subscription sharing its request.
+
+    The stream is read while any subscription is active, an ended stream is reopened after the shortest poll wait
+    of the active subscriptions.
+    """
+
+    async def poll(self, poll_wait_seconds: int) -> None:
+        while True:
+            await self.stream()
+            await asyncio.sleep(poll_wait_seconds)
+
+    async def stream(self) -> None:
+        """Deliver the readings pushed by the sensor, batching those that arrived since the previous delivery.
+
+        Readings are buffered in a bounded queue, once it is full the stream is no longer read until the queue has
+        been delivered, leaving any further events to the backend's connection.
+        """
+        queue: asyncio.Queue[Optional[SensorReading]] = asyncio.Queue(STREAM_QUEUE_SIZE)
+        reader = asyncio.create_task(self.read_stream(queue))
+        try:
+            while True:
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+                readings = [reading for reading in batch if reading is not None]
+                if readings:
+                    metrics.observe("sensor_stream_batch_size", self.sensor.get_metric_labels(), len(readings))
+                    self.publish(readings)
+                if batch[-1] is None:
+                    return
+        finally:
+            reader.cancel()
+
+    async def read_stream(self, queue: "asyncio.Queue[Optional[SensorReading]]") -> None:
+        """Queue the readings of the stream, followed by None once it ended."""
+        try:
+            async for reading in self.sensor.stream_sensor_data():
+                await queue.put(reading)
+        except Exception as stream_exception:
+            await queue.put(SensorReading([str(type(stream_exception).__name__)]))
+        await queue.put(None)
+
+
+class PollingEngine:
+    """Owns every sensor fetch, running each unique sensor request once per tick regardless of subscribers."""
+
+    def __init__(self, cache: SensorCache, store: Optional[HistoryStore] = None) -> None:
+        super().__init__()
+        self.cache = cache
+        self.store = store
+        self.jobs: Dict[Hashable, PollingJob] = {}
+        self.phases: Dict[Hashable, float] = {}
+
+    def resolve_sensor(self, sensor_config: SensorConfig, context: Dict[str, Any]) -> Sensor:
+        return resolve_sensor(sensor_config, context)
+
+    def subscribe(self, sensor: Sensor, poll_wait_seconds: int, callback: SensorCallback) -> Subscription:
+        key = sensor.get_request_key()
+        if key not in self.jobs:
+            self.jobs[key] = (StreamingJob if sensor.is_streaming() else PollingJob)(self, key, sensor)
+        job = self.jobs[key]
+        subscription = Subscription(job, callback, poll_wait_seconds)
+        job.subscribe(subscription)
+        return subscription
+
+    def load_cached(self, key: Hashable, sensor: Sensor) -> Optional[CachedReadings]:
+        """Cached readings of a sensor, read from the history store when they are not cached since the app started.
+
+        Incremental sensors start from the readings of all their fetches within the cache's ttl and continue after the
+        high-water mark of the newest of them, other sensors start from the readings of their latest fetch.
+        """
+        cached = self.cache.get(key)
+        history_key = sensor.get_history_key()
+        if cached is None and self.store is not None and history_key is not None:
+            if sensor.is_incremental():
+                stored = self.store.get_since(history_key, time.time() - self.cache.ttl_seconds)
+                if stored:
+                    readings = [reading for _, readings in stored for reading in readings]
+                    self.cache.put(key, readings[-sensor.get_max_readings():], stored[-1][0],
+                                   self.store.get_high_water_mark(history_key))
+            else:
+                latest = self.store.get_latest(history_key)
+                if latest is not None:
+                    self.cache.put(key, latest[1], latest[0])
+            cached = self.cache.get(key)
+        # only the readings before the high-water mark are served, an incremental sensor without them starts afresh
+        if cached is not None and cached.high_water_mark is not None:
+            sensor.set_high_water_mark(cached.high_water_mark)
+        return cached
+
+    async def fetch_history(self, sensor: Sensor, start: float, end: float, step: float) -> List[SensorReading]:
+        """Readings between two unix timestamps, oldest first, taken from the history store where it has them.
+
+        Only the time before the oldest and after the newest stored fetch is queried from the sensor itself.
+        """
+        history_key = sensor.get_history_key()
+        if self.store is None or history_key is None:
+            return list(await sensor.fetch_sensor_history(start, end, step))
+        stored = self.store.get_since(history_key, start)
+        if not stored:
+            return list(await sensor.fetch_sensor_history(start, end, step))
+
+        readings = []
+        if stored[0][0] - step > start:
+            readings += await sensor.fetch_sensor_history(start, stored[0][0] - step, step)
+        readings += [reading for _, stored_readings in stored for reading in stored_readings]
+        if stored[-1][0] + step < end:
+            readings += await sensor.fetch_sensor_history(stored[-1][0] + step, end, step)
+        return readings
+
+    def store_readings(self, sensor: Sensor, readings: List[SensorReading], fetched_at: float) -> None:
+        history_key = sensor.get_history_key()
+        if self.store is not None and history_key is not None:
+            self.store.put(history_key, readings, fetched_at, sensor.get_high_water_mark())
+
+    def get_phase(self, schedule_key: Hashable) -> float:
+        """Fraction of the poll interval by which the ticks of a schedule group are offset."""
+        if schedule_key not in self.phases:
+            self.phases[schedule_key] = random.random()
+        return self.phases[schedule_key]
+
+    def remove_job(self, job: PollingJob) -> None:
+        if self.jobs.get(job.key) is job:
+            del self.jobs[job.key]
+
+    def close(self) -> None:
+        for job in list(self.jobs.values()):
+            job.close()
+        self.jobs.clear()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+
+polling_engine = PollingEngine(SensorCache())
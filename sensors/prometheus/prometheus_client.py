@@ -0,0 +1,97 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from sensors.backend_traffic import traffic
+from sensors.circuit_breaker import get_circuit_breaker
+from sensors.fetch_scheduler import scheduler
+from sensors.metrics import metrics
+
+# longer queries, e.g. folded over many services, are sent as a form as servers limit the length of urls
+MAX_URL_QUERY_LENGTH = 4096
+
+
+class PrometheusClientException(Exception):
+    pass
+
+
+class PrometheusServerException(PrometheusClientException):
+    pass
+
+
+def is_server_failure(exception: BaseException) -> bool:
+    """Whether the server failed rather than rejected the request, only the former count towards its circuit."""
+    return isinstance(exception, (aiohttp.ClientError, asyncio.TimeoutError, PrometheusServerException))
+
+
+class AsyncPrometheusClient:
+    """Minimal asyncio client for the Prometheus HTTP API, keeping connections to the server alive between polls."""
+
+    def __init__(self, url: str, timeout_seconds: float = 30, max_connections: int = 32) -> None:
+        super().__init__()
+        self.url = url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.max_connections = max_connections
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.circuit_breaker = get_circuit_breaker(self.url)
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the pooled session, it must be bound to the running event loop."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, ssl=False, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    async def custom_query(self, query: str) -> Any:
+        return await self.request("query", {"query": query})
+
+    async def custom_query_range(self, query: str, start: float, end: float, step: float) -> Any:
+        return await self.request("query_range", {"query": query, "start": str(start), "end": str(end), "step": str(step)})
+
+    async def request(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        async with scheduler.slot(self.url):
+            body, status = await self.circuit_breaker.call(lambda: self.get(endpoint, params), is_server_failure)
+        if body.get("status") != "success":
+            raise PrometheusClientException(body.get("error", f"HTTP Status Code {status}"))
+        return body["data"]["result"]
+
+    async def get(self, endpoint: str, params: Dict[str, Any]) -> Any:
+        with metrics.timer("backend_request_seconds", {"url": self.url}):
+            if traffic.replayer is not None:
+                request = {"endpoint": endpoint, "params": params}
+                payload, status = await traffic.replayer.replay_query(self.url, request)
+            else:
+                payload, status = await self.send(endpoint, params)
+        if status >= 500:
+            raise PrometheusServerException(f"HTTP Status Code {status}")
+        metrics.observe("backend_response_bytes", {"url": self.url}, len(payload))
+        try:
+            body = json.loads(payload)
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            # e.g. the html page of a proxy or sso gateway in front of the server
+            raise PrometheusClientException(f"HTTP Status Code {status}: invalid response")
+        return body, status
+
+    async def send(self, endpoint: str, params: Dict[str, Any]) -> Tuple[bytes, int]:
+        start = time.perf_counter()
+        url = f"{self.url}/api/v1/{endpoint}"
+        if len(params["query"]) > MAX_URL_QUERY_LENGTH:
+            request = self.get_session().post(url, data=params)
+        else:
+            request = self.get_session().get(url, params=params)
+        async with request as response:
+            payload = await response.read()
+        if traffic.recorder is not None:
+            traffic.recorder.record(self.url, "prometheus", {"endpoint": endpoint, "params": params}, payload,
+                                    response.status, time.perf_counter() - start)
+        return payload, response.status
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -1,47 +1,87 @@
 import asyncio
 from string import Template
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, Hashable, Optional
 
-from prometheus_api_client import PrometheusConnect, PrometheusApiClientException
-from requests import RequestException
+import aiohttp
 from rich.console import RenderableType
 
 import config.config
+from sensors.circuit_breaker import CircuitOpenException
+from sensors.prometheus.prometheus_client import AsyncPrometheusClient, PrometheusClientException
+from sensors.prometheus.query_folder import get_fold, get_folder
 from sensors.sensor import Sensor, SensorReading
 
-clients: dict[str, PrometheusConnect] = {}
+clients: dict[str, AsyncPrometheusClient] = {}
 
 
 class PrometheusSensor(Sensor):
     def __init__(self, sensor_configuration: Dict[str, Any], context: Dict[str, Any]) -> None:
         super().__init__()
         if sensor_configuration["url"] not in clients:
-            clients[sensor_configuration["url"]] = PrometheusConnect(url=sensor_configuration["url"], disable_ssl=True)
+            clients[sensor_configuration["url"]] = AsyncPrometheusClient(sensor_configuration["url"])
         self.client = clients[sensor_configuration["url"]]
+        self.url = sensor_configuration["url"]
+        self.name = sensor_configuration["name"]
 
         self.metrics = sensor_configuration["metrics"]
         self.context = context
+        # label and variable of each query which can be folded with the same query of other services
+        self.folder = get_folder(self.client)
+        self.folds = {metric["query"]: get_fold(metric["query"]) for metric in self.metrics
+                      if sensor_configuration.get("fold", True) and context is not None}
 
     def get_sensor_fields(self) -> Iterable[RenderableType]:
         return map(lambda metric: metric["name"], self.metrics)
 
+    def get_metric_labels(self) -> Dict[str, str]:
+        return {"sensor": self.name, "url": self.url}
+
+    def get_request_key(self) -> Hashable:
+        return "prometheus", self.url, tuple(self.format_query(metric["query"]) for metric in self.metrics)
+
+    def get_schedule_key(self) -> Hashable:
+        """Queries against one server are ticked together so the folder can fold them across services."""
+        return "prometheus", self.url
+
+    def get_history_key(self) -> Optional[str]:
+        return repr(self.get_request_key())
+
     async def fetch_sensor_data(self) -> Iterable[SensorReading]:
-        return await asyncio.get_event_loop().run_in_executor(None, self.fetch_sensor_readings)
+        measurements = await self.fetch_measurements()
+        return [SensorReading(map(lambda measurement: self.format_measurement(measurement), measurements))]
 
-    def fetch_sensor_readings(self) -> Iterable[SensorReading]:
-        formatted_readings = map(lambda measurement: self.format_measurement(measurement), self.fetch_measurements())
-        yield SensorReading(formatted_readings)
+    async def fetch_measurements(self) -> Iterable[Any]:
+        """Query all metrics concurrently, the sensor is only as slow as its slowest metric."""
+        return await asyncio.gather(*map(self.fetch_measurement, self.metrics))
 
-    def fetch_measurements(self) -> Iterable[Any]:
-        return map(self.fetch_measurement, self.metrics)
+    async def fetch_sensor_history(self, start: float, end: float, step: float) -> Iterable[SensorReading]:
+        """Fetch the history of every metric with a single range query each, aligned on their timestamps.
 
-    def fetch_measurement(self, metric: Dict[str, Any]) -> Any:
+        A metric without a sample at a timestamp of the others is None there, e.g. as its range is empty.
+        """
         try:
-            return self.client.custom_query(self.format_query(metric["query"]))
-        except RequestException:
-            return "RequestException"
-        except PrometheusApiClientException:
-            return "PrometheusApiClientException"
+            series = await asyncio.gather(*map(
+                lambda metric: self.client.custom_query_range(self.format_query(metric["query"]), start, end, step),
+                self.metrics))
+        except (aiohttp.ClientError, asyncio.TimeoutError, PrometheusClientException, CircuitOpenException):
+            return []
+
+        values_by_timestamp = [dict(result[0]["values"]) if result else {} for result in series]
+        timestamps = sorted(set().union(*map(lambda values: values.keys(), values_by_timestamp)))
+        return [SensorReading([values.get(timestamp) for values in values_by_timestamp]) for timestamp in timestamps]
+
+    async def fetch_measurement(self, metric: Dict[str, Any]) -> Any:
+        try:
+            return await self.query(metric["query"])
+        except (aiohttp.ClientError, asyncio.TimeoutError, PrometheusClientException,
+                CircuitOpenException) as request_exception:
+            return str(type(request_exception).__name__)
+
+    async def query(self, query: str) -> Any:
+        fold = self.folds.get(query)
+        if fold is not None and fold[1] in self.context:
+            return await self.folder.query(query, *fold, str(self.context[fold[1]]))
+        return await self.client.custom_query(self.format_query(query))
 
     def format_query(self, query: str) -> str:
         if self.context is None:
@@ -52,6 +92,8 @@ class PrometheusSensor(Sensor):
     def format_measurement(measurement: Any) -> str:
         if isinstance(measurement, str):
             return measurement
+        if not measurement:
+            return "N/A"
         return str(measurement[0]["value"][1])
 
 
@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import re
+from string import Template
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, current_priority
+from sensors.prometheus.prometheus_client import AsyncPrometheusClient, PrometheusClientException
+
+FOLD_WINDOW_SECONDS = 0.05
+
+# characters with a meaning in the RE2 syntax of label regex matchers
+REGEX_SPECIAL_CHARACTERS = re.compile(r"([\\.+*?()|\[\]{}^$])")
+
+# aggregations across series, a folded query would aggregate across services unless grouped by the folded label
+AGGREGATION = re.compile(r"\b(sum|min|max|avg|group|stddev|stdvar|count|count_values|bottomk|topk|quantile|limitk|"
+                         r"limit_ratio)\s*(\(|by\b|without\b)")
+
+# functions and operators whose result for one value depends on the series of the others, or on whether there are
+# any, e.g. `absent` of a folded query is empty while any one service is up and `or vector(0)` is added only once
+CROSS_SERIES = re.compile(r"\b(absent|absent_over_time|vector)\s*\(|\b(or|unless|and)\b|"
+                          r"\b(on|ignoring|group_left|group_right)\s*\(")
+
+FoldKey = Tuple[str, str, str]
+
+
+class UnfoldableQueryException(Exception):
+    """The result of a folded query could not be split by its label, e.g. because the query aggregates it away."""
+
+
+class QueryFolder:
+    """Collects the instant queries against one server issued within a short window and folds those that only differ
+    in the value of a single label matcher into one query with a regex matcher, whose result is split by the label.
+
+    Queries are folded from a template in which one variable only appears as the value of `label="$variable"`
+    matchers. A template whose folded query fails, or whose results lack the label, falls back to a query per value
+    from then on.
+    """
+
+    def __init__(self, client: AsyncPrometheusClient, window_seconds: float = FOLD_WINDOW_SECONDS) -> None:
+        super().__init__()
+        self.client = client
+        self.window_seconds = window_seconds
+        self.pending: Dict[FoldKey, List[Tuple[str, asyncio.Future]]] = {}
+        self.unfoldable: Set[FoldKey] = set()
+        self.pending_priority = PRIORITY_BACKGROUND
+        self.flush_task: Optional[asyncio.Task] = None
+
+    async def query(self, template: str, label: str, variable: str, value: str) -> Any:
+        """Query the template with the variable substituted by the value, folded with concurrent queries of it."""
+        key = (template, label, variable)
+        if key in self.unfoldable:
+            return await self.client.custom_query(self.format(key, value))
+        future = asyncio.get_running_loop().create_future()
+        if self.flush_task is None:
+            self.pending = {}
+            self.flush_task = asyncio.create_task(self.flush_later(self.pending))
+            self.flush_task.add_done_callback(functools.partial(self.flushed, self.pending))
+        self.pending.setdefault(key, []).append((value, future))
+        self.pending_priority = min(self.pending_priority, current_priority.get())
+        return await future
+
+    async def flush_later(self, pending: Dict[FoldKey, List[Tuple[str, asyncio.Future]]]) -> None:
+        await asyncio.sleep(self.window_seconds)
+        # folded queries are as urgent as the most urgent of the queries they answer
+        current_priority.set(self.pending_priority)
+        self.end_window()
+        await asyncio.gather(*[self.flush(key, queries) for key, queries in pending.items()])
+
+    def end_window(self) -> None:
+        """Let queries from here on start a new window."""
+        self.pending = {}
+        self.pending_priority = PRIORITY_BACKGROUND
+        self.flush_task = None
+
+    def flushed(self, pending: Dict[FoldKey, List[Tuple[str, asyncio.Future]]], _: asyncio.Task) -> None:
+        """Fail the queries a cancelled flush left without a result rather than leave them waiting forever."""
+        if self.pending is pending:
+            self.end_window()
+        for queries in pending.values():
+            for _, future in queries:
+                if not future.done():
+                    future.set_exception(PrometheusClientException("query cancelled"))
+
+    async def flush(self, key: FoldKey, queries: List[Tuple[str, asyncio.Future]]) -> None:
+        values = list(dict.fromkeys(value for value, _ in queries))
+        if len(values) == 1:
+            results = await self.query_each(key, values)
+        else:
+            try:
+                results = await self.query_folded(key, values)
+            except Exception:
+                # the error may be caused by folding, e.g. a many-to-many match or a query too long for the server
+                self.unfoldable.add(key)
+                results = await self.query_each(key, values)
+
+        for value, future in queries:
+            if future.done():
+                continue
+            if isinstance(results[value], Exception):
+                future.set_exception(results[value])
+            else:
+                future.set_result(results[value])
+
+    async def query_each(self, key: FoldKey, values: List[str]) -> Dict[str, Any]:
+        return dict(zip(values, await asyncio.gather(
+            *[self.client.custom_query(self.format(key, value)) for value in values], return_exceptions=True)))
+
+    async def query_folded(self, key: FoldKey, values: List[str]) -> Dict[str, Any]:
+        _, label, _ = key
+        pattern = "|".join(REGEX_SPECIAL_CHARACTERS.sub(r"\\\1", value) for value in values)
+        series = await self.client.custom_query(self.substitute_regex(key, pattern))
+        results: Dict[str, List[Any]] = {value: [] for value in values}
+        for result in series:
+            value = result.get("metric", {}).get(label)
+            if value not in results:
+                raise UnfoldableQueryException(f"Series without a requested {label}: {result.get('metric')}")
+            results[value].append(result)
+        return results
+
+    @staticmethod
+    def format(key: FoldKey, value: str) -> str:
+        template, _, variable = key
+        return Template(template).substitute({variable: value})
+
+    @staticmethod
+    def substitute_regex(key: FoldKey, pattern: str) -> str:
+        template, label, variable = key
+        return get_matcher_pattern(label, variable).sub(lambda _: f"{label}=~{QueryFolder.quote(pattern)}", template)
+
+    @staticmethod
+    def quote(value: str) -> str:
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def get_matcher_pattern(label: str, variable: str) -> re.Pattern:
+    return re.compile(rf'\b{re.escape(label)}\s*=\s*"\$(?:{variable}\b|\{{{variable}\}})"')
+
+
+def get_fold(template: str) -> Optional[Tuple[str, str]]:
+    """Label and variable of a template whose only variable is the value of `label="$variable"` matchers."""
+    variables = {match[0] or match[1] for match in re.findall(r"\$(?:([_a-zA-Z]\w*)|\{([_a-zA-Z]\w*)\})", template)}
+    if len(variables) != 1 or "$$" in template or CROSS_SERIES.search(template):
+        return None
+    variable = variables.pop()
+    labels = set(re.findall(rf'\b(\w+)\s*=\s*"\$(?:{variable}\b|\{{{variable}\}})"', template))
+    if len(labels) != 1:
+        return None
+    label = labels.pop()
+    if "$" in get_matcher_pattern(label, variable).sub("", template):
+        return None
+    if AGGREGATION.search(template) and not re.search(rf"\bby\s*\([^)]*\b{label}\b", template):
+        return None
+    return label, variable
+
+
+folders: dict[AsyncPrometheusClient, QueryFolder] = {}
+
+
+def get_folder(client: AsyncPrometheusClient) -> QueryFolder:
+    if client not in folders:
+        folders[client] = QueryFolder(client)
+    return folders[client]
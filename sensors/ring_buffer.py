@@ -0,0 +1,39 @@
+from array import array
+from typing import Iterable, List
+
+
+class RingBuffer:
+    """Fixed capacity buffer of floats, appending to a full buffer overwrites the oldest value."""
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self.capacity = max(1, capacity)
+        self.values = array("d", bytes(8 * self.capacity))
+        self.start = 0
+        self.size = 0
+
+    def append(self, value: float) -> None:
+        end = (self.start + self.size) % self.capacity
+        self.values[end] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.append(value)
+
+    def clear(self) -> None:
+        self.start = 0
+        self.size = 0
+
+    def to_list(self) -> List[float]:
+        """Return the buffered values ordered from oldest to newest."""
+        end = self.start + self.size
+        if end <= self.capacity:
+            return self.values[self.start:end].tolist()
+        return self.values[self.start:].tolist() + self.values[:end - self.capacity].tolist()
+
+    def __len__(self) -> int:
+        return self.size
@@ -0,0 +1,148 @@
+import asyncio
+import functools
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sensors.backend_traffic import traffic
+from sensors.circuit_breaker import get_circuit_breaker
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, current_priority, scheduler
+from sensors.metrics import metrics
+from sensors.worker_pool import RawResponse, run_in_pool
+
+BATCH_WINDOW_SECONDS = 0.05
+
+ResponseTransform = Callable[[Dict[str, Any]], Any]
+PendingSearch = Tuple[str, Dict[str, Any], Optional[ResponseTransform], asyncio.Future]
+
+
+class SearchResponseError(Exception):
+    """A single search of an _msearch failed while the others succeeded."""
+
+    def __init__(self, response: Dict[str, Any]) -> None:
+        error = response.get("error", {})
+        self.error_type = error.get("type", "search_error") if isinstance(error, dict) else str(error)
+        super().__init__(self.error_type)
+        self.response = response
+
+
+class SearchBatcher:
+    """Collects the searches against one cluster issued within a short window and sends them as a single _msearch."""
+
+    def __init__(self, client: Any, url: str, is_failure: Callable[[BaseException], bool],
+                 filter_path: Optional[str] = None, window_seconds: float = BATCH_WINDOW_SECONDS) -> None:
+        super().__init__()
+        self.client = client
+        self.url = url
+        self.circuit_breaker = get_circuit_breaker(url)
+        # which exceptions of the client are failures of the cluster, counting towards its circuit
+        self.is_failure = is_failure
+        self.filter_path = filter_path
+        self.window_seconds = window_seconds
+        self.pending: List[PendingSearch] = []
+        self.pending_priority = PRIORITY_BACKGROUND
+        self.flush_task: Optional[asyncio.Task] = None
+
+    async def search(self, index: str, body: Dict[str, Any], transform: Optional[ResponseTransform] = None) -> Any:
+        """Search, returning the response or what transform builds from it, on the worker pool for large responses."""
+        future = asyncio.get_running_loop().create_future()
+        if self.flush_task is None:
+            self.pending = []
+            self.flush_task = asyncio.create_task(self.flush_later(self.pending))
+            self.flush_task.add_done_callback(functools.partial(self.flushed, self.pending))
+        self.pending.append((index, body, transform, future))
+        self.pending_priority = min(self.pending_priority, current_priority.get())
+        return await future
+
+    async def flush_later(self, pending: List[PendingSearch]) -> None:
+        await asyncio.sleep(self.window_seconds)
+        # the batch is as urgent as the most urgent of its searches
+        current_priority.set(self.pending_priority)
+        self.end_batch()
+        await self.flush(pending)
+
+    def end_batch(self) -> None:
+        """Let searches from here on start a new batch."""
+        self.pending = []
+        self.pending_priority = PRIORITY_BACKGROUND
+        self.flush_task = None
+
+    def flushed(self, pending: List[PendingSearch], _: asyncio.Task) -> None:
+        """Fail the searches a cancelled flush left without a response rather than leave them waiting forever."""
+        if self.pending is pending:
+            self.end_batch()
+        for _, _, _, future in pending:
+            if not future.done():
+                future.set_exception(SearchResponseError({"error": {"type": "search_cancelled"}}))
+
+    async def flush(self, pending: List[PendingSearch]) -> None:
+        searches = []
+        for index, body, _, _ in pending:
+            searches.append({"index": index})
+            searches.append(body)
+
+        params = {} if self.filter_path is None else {"filter_path": self.filter_path}
+        transforms = [transform for _, _, transform, _ in pending]
+        try:
+            async with scheduler.slot(self.url):
+                with metrics.timer("backend_request_seconds", {"url": self.url}):
+                    results = await self.msearch(searches, params)
+            if isinstance(results, RawResponse):
+                outcomes = await run_in_pool(self.read_responses, results, transforms)
+            else:
+                outcomes = self.read_responses(results, transforms)
+        except Exception as search_exception:
+            for _, _, _, future in pending:
+                if not future.done():
+                    future.set_exception(search_exception)
+            return
+
+        for (_, _, _, future), outcome in zip(pending, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def msearch(self, searches: List[Dict[str, Any]], params: Dict[str, Any]) -> Dict[str, Any] | RawResponse:
+        """Send the searches, or answer them from a replayed recording, recording the response while recording."""
+        if traffic.replayer is not None:
+            payload = await traffic.replayer.replay_searches(self.url, searches)
+            return self.client.transport.serializer.loads(payload)
+        start = time.perf_counter()
+        results = await self.circuit_breaker.call(lambda: self.client.msearch(body=searches, **params), self.is_failure)
+        if traffic.recorder is not None:
+            payload = results.payload if isinstance(results, RawResponse) else json.dumps(results)
+            traffic.recorder.record(self.url, "msearch", {"searches": searches, "params": params}, payload, 200,
+                                    time.perf_counter() - start)
+        return results
+
+    @staticmethod
+    def read_responses(results: Dict[str, Any] | RawResponse,
+                       transforms: List[Optional[ResponseTransform]]) -> List[Any]:
+        """Split an _msearch into the outcome of each search, the exception of those which failed."""
+        if isinstance(results, RawResponse):
+            results = results.decode()
+        responses = results.get("responses", [])
+        outcomes = []
+        for i, transform in enumerate(transforms):
+            response = responses[i] if i < len(responses) else {"error": {"type": "missing_response"}}
+            if "error" in response:
+                outcomes.append(SearchResponseError(response))
+                continue
+            try:
+                outcomes.append(transform(response) if transform is not None else response)
+            except Exception as transform_exception:
+                outcomes.append(transform_exception)
+        return outcomes
+
+
+batchers: dict[Any, SearchBatcher] = {}
+
+
+def get_batcher(client: Any, url: str, is_failure: Callable[[BaseException], bool],
+                filter_path: Optional[str] = None) -> SearchBatcher:
+    if client not in batchers:
+        batchers[client] = SearchBatcher(client, url, is_failure, filter_path)
+    return batchers[client]
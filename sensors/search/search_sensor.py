@@ -0,0 +1,266 @@
+import asyncio
+import itertools
+import json
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from config.config import SensorConfig
+from sensors.circuit_breaker import CircuitOpenException
+from sensors.search.search_batcher import get_batcher, ResponseTransform, SearchResponseError
+from sensors.sensor import Sensor, SensorReading, EMPTY_SENSOR_READING
+
+# every _msearch item keeps its status so responses stay aligned with their searches when filtered
+SEARCH_FILTER_PATH = ",".join([
+    "responses.status",
+    "responses.error",
+    "responses.hits.hits._id",
+    "responses.hits.hits._source",
+    "responses.hits.hits.sort",
+    "responses.aggregations.groups.buckets.group_docs.hits.hits._id",
+    "responses.aggregations.groups.buckets.group_docs.hits.hits._source",
+    "responses.aggregations.groups.after_key",
+])
+
+
+# newest sort value a tailing search has seen and the ids of the documents sorted at it
+TailState = Tuple[Optional[Any], Set[str]]
+
+
+class SearchSensor(Sensor):
+    """Common behaviour of the elastic and opensearch sensors, which share their query dsl."""
+
+    sensor_type = "search"
+    search_exception = Exception
+    connection_exception = Exception
+    transport_exception = Exception
+
+    def __init__(self, sensor_configuration: Dict[str, Any], context: Dict[str, Any]):
+        super(SearchSensor, self).__init__()
+        self.url = sensor_configuration["url"]
+        self.name = sensor_configuration["name"]
+        self.client = self.get_client(self.url)
+        self.batcher = get_batcher(self.client, self.url, self.is_cluster_failure, SEARCH_FILTER_PATH)
+        self.context = context
+        self.result_fields = sensor_configuration["result_fields"]
+        self.detail_fields = sensor_configuration.get("detail_fields", [])
+        self.source_fields = list(dict.fromkeys(self.result_fields + self.detail_fields))
+        self.index = self.format_json(sensor_configuration["index_pattern"], self.context)
+
+        self.query = self.format_json(sensor_configuration["query"], self.context)
+        self.sub_query = self.format_json(sensor_configuration.get("sub_query", None), self.context)
+        self.aggregation = self.format_json(sensor_configuration.get("aggregation", None), self.context)
+        self.sort = self.format_json(sensor_configuration.get("sort", None), self.context)
+
+        self.args = {
+            "size": self.format_json(sensor_configuration["max_hits"], self.context),
+            "_source": {"includes": self.source_fields}
+        }
+
+        if self.sub_query is not None:
+            self.args["query"] = {"bool": {"must": [self.query, self.sub_query]}}
+        else:
+            self.args["query"] = {"bool": {"must": [self.query]}}
+        if self.sort is not None:
+            self.args["sort"] = self.sort
+        if self.aggregation is not None:
+            self.args["aggs"] = {"groups": self.with_source_filter(self.aggregation)}
+
+        self.reverse_results = sensor_configuration.get("reverse_results", False)
+        self.max_pages = sensor_configuration.get("max_pages", 100)
+        self.max_rows = SensorConfig(sensor_configuration).get_max_rows()
+
+        self.tail_sort = self.get_tail_sort(self.sort) if sensor_configuration.get("tail", False) else None
+        self.tail_position: Optional[Any] = None
+        self.tail_ids: Set[str] = set()
+
+    def get_client(self, url: str) -> Any:
+        pass
+
+    @classmethod
+    def is_cluster_failure(cls, exception: BaseException) -> bool:
+        """Whether the cluster failed rather than rejected the search, e.g. as malformed, only the former count towards
+        its circuit."""
+        if isinstance(exception, (cls.connection_exception, asyncio.TimeoutError)):
+            return True
+        if not isinstance(exception, cls.transport_exception):
+            return False
+        status_code = getattr(exception, "status_code", None)
+        return isinstance(status_code, int) and status_code >= 500
+
+    async def search(self, body: Dict[str, Any], transform: Optional[ResponseTransform] = None) -> Any:
+        """Search through the cluster's batcher, which coalesces concurrent searches into one _msearch."""
+        return await self.batcher.search(self.index, body, transform)
+
+    def get_sensor_fields(self) -> Iterable[str]:
+        return self.result_fields
+
+    def get_metric_labels(self) -> Dict[str, str]:
+        return {"sensor": self.name, "url": self.url}
+
+    def get_request_key(self) -> Hashable:
+        return (self.sensor_type, self.url, self.index, json.dumps(self.args, sort_keys=True),
+                tuple(self.result_fields), self.reverse_results, self.tail_sort is not None)
+
+    def get_schedule_key(self) -> Hashable:
+        """Searches against one cluster are ticked together so the batcher can send them as a single _msearch."""
+        return self.sensor_type, self.url
+
+    def get_history_key(self) -> Optional[str]:
+        return repr(self.get_request_key())
+
+    def is_incremental(self) -> bool:
+        return self.tail_sort is not None and self.aggregation is None
+
+    def get_max_readings(self) -> int:
+        return self.max_rows
+
+    def get_high_water_mark(self) -> Optional[Any]:
+        if self.tail_position is None:
+            return None
+        return {"position": self.tail_position, "ids": sorted(self.tail_ids)}
+
+    def set_high_water_mark(self, high_water_mark: Any) -> None:
+        if self.is_incremental() and self.tail_position is None:
+            self.tail_position = high_water_mark["position"]
+            self.tail_ids = set(high_water_mark["ids"])
+
+    def is_tailing(self) -> bool:
+        return self.tail_sort is not None and self.aggregation is None and self.tail_position is not None
+
+    def get_search_body(self) -> Dict[str, Any]:
+        """Build the search, once tailing only documents at or after the newest seen sort value are requested."""
+        if not self.is_tailing():
+            return self.args
+        field, _ = self.tail_sort
+        return self.args | {
+            "query": {"bool": {
+                "must": self.args["query"]["bool"]["must"],
+                "filter": [{"range": {field: {"gte": self.tail_position}}}]
+            }},
+            "sort": [{field: {"order": "asc"}}]
+        }
+
+    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
+        """Fetch the readings, which are built from large responses by the worker pool while they are decoded.
+
+        Readings are built from the tail state at the start of the fetch, the state they advance to is only taken over
+        back on the event loop.
+        """
+        tail = self.tail_position, set(self.tail_ids)
+        try:
+            if self.aggregation is not None:
+                return await self.fetch_aggregation()
+            readings, (self.tail_position, self.tail_ids) = await self.search(
+                self.get_search_body(), lambda response: self.read_hits(response, tail))
+            return readings
+        except SearchResponseError as response_error:
+            return [SensorReading([response_error.error_type])]
+        except (self.search_exception, CircuitOpenException) as search_exception:
+            return [SensorReading([str(type(search_exception).__name__)])]
+
+    def read_hits(self, response: Dict[str, Any], tail: TailState) -> Tuple[List[SensorReading], TailState]:
+        """Readings of the hits and the tail state after them, without changing the sensor's own tail state."""
+        hits = response.get("hits", {}).get("hits", [])
+        if self.tail_sort is not None:
+            tailing = tail[0] is not None
+            hits, tail = self.advance_tail(hits, tail)
+            if tailing and self.tail_sort[1] == "desc":
+                hits.reverse()
+        readings = [self.to_reading(hit) for hit in hits]
+        if self.reverse_results:
+            readings.reverse()
+        return readings, tail
+
+    async def fetch_aggregation(self) -> List[SensorReading]:
+        """Fetch the documents of each bucket, following the after_key of a composite aggregation for max_pages."""
+        body = self.get_search_body()
+        composite = self.aggregation.get("composite")
+        pages, bucket_count = [], 0
+        for _ in range(self.max_pages):
+            readings, page_bucket_count, after_key = await self.search(body, self.read_buckets)
+            pages.append(readings)
+            bucket_count += page_bucket_count
+            if composite is None or after_key is None or page_bucket_count < composite.get("size", 10):
+                break
+            body = body | {"size": 0, "aggs": {"groups": body["aggs"]["groups"] | {
+                "composite": composite | {"after": after_key}}}}
+
+        if not bucket_count:
+            return [EMPTY_SENSOR_READING]
+        readings = list(itertools.chain.from_iterable(pages))
+        if self.reverse_results:
+            readings.reverse()
+        return readings
+
+    def read_buckets(self, response: Dict[str, Any]) -> Tuple[List[SensorReading], int, Optional[Dict[str, Any]]]:
+        """Readings of the documents of every bucket of a page, the number of buckets and the key after them."""
+        groups = response.get("aggregations", {}).get("groups", {})
+        buckets = groups.get("buckets", [])
+        hits = itertools.chain.from_iterable(
+            bucket.get("group_docs", {}).get("hits", {}).get("hits", []) for bucket in buckets)
+        return [self.to_reading(hit) for hit in hits], len(buckets), groups.get("after_key")
+
+    def to_reading(self, hit: Dict[str, Any]) -> SensorReading:
+        return SensorReading(self.strip_message(hit.get("_source", {})), hit.get("_source", {}), hit.get("_id"))
+
+    async def fetch_sensor_details(self, key: str) -> Optional[Any]:
+        """Fetch the complete document of a reading by its id, search results only carry the configured fields."""
+        try:
+            results = await self.search({"query": {"ids": {"values": [key]}}, "size": 1})
+        except (SearchResponseError, self.search_exception, CircuitOpenException) as search_exception:
+            return str(search_exception)
+        hits = results.get("hits", {}).get("hits", [])
+        return hits[0].get("_source") if hits else None
+
+    def with_source_filter(self, aggregation: Dict[str, Any]) -> Dict[str, Any]:
+        """Limit the documents of a group_docs top_hits aggregation to the configured fields unless it filters itself."""
+        top_hits = aggregation.get("aggs", {}).get("group_docs", {}).get("top_hits")
+        if top_hits is None or "_source" in top_hits:
+            return aggregation
+        return aggregation | {"aggs": aggregation["aggs"] | {
+            "group_docs": aggregation["aggs"]["group_docs"] | {
+                "top_hits": top_hits | {"_source": {"includes": self.source_fields}}}}}
+
+    def advance_tail(self, hits: List[Dict[str, Any]], tail: TailState) -> Tuple[List[Dict[str, Any]], TailState]:
+        """Drop hits already returned by a previous fetch and advance the tail to the newest sort value seen."""
+        tail_position, tail_ids = tail
+        hits = [hit for hit in hits if hit.get("_id") not in tail_ids and hit.get("sort")]
+        tail_ids = set(tail_ids)
+        for hit in hits:
+            position = hit["sort"][0]
+            if not self.is_comparable(position, tail_position):
+                # e.g. documents missing the sort field, they are shown but do not move the tail
+                continue
+            if tail_position is None or position > tail_position:
+                tail_position = position
+                tail_ids = set()
+            if position == tail_position:
+                tail_ids.add(hit["_id"])
+        return hits, (tail_position, tail_ids)
+
+    @staticmethod
+    def is_comparable(position: Any, tail_position: Any) -> bool:
+        if position is None:
+            return False
+        if tail_position is None:
+            return True
+        numbers = (int, float)
+        if isinstance(position, numbers) and isinstance(tail_position, numbers):
+            return not isinstance(position, bool) and not isinstance(tail_position, bool)
+        return type(position) is type(tail_position)
+
+    def strip_message(self, message: Dict[str, Any]) -> Iterable[str]:
+        return map(lambda result_field: str(message.get(result_field, "N/A")), self.result_fields)
+
+    @staticmethod
+    def get_tail_sort(sort: Any) -> Optional[Tuple[str, str]]:
+        """Return the field and direction of the primary sort, which tailing follows."""
+        if isinstance(sort, list):
+            sort = sort[0] if sort else None
+        if isinstance(sort, str):
+            return sort, "asc"
+        if not isinstance(sort, dict) or not sort:
+            return None
+        field, order = next(iter(sort.items()))
+        if isinstance(order, dict):
+            order = order.get("order", "asc")
+        return field, str(order).lower()
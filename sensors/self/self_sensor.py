@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, Hashable, Iterable
+
+from rich.console import RenderableType
+
+from sensors.metrics import metrics, Histogram
+from sensors.sensor import Sensor, SensorReading
+
+DEFAULT_STATISTICS = ["count", "mean", "p50", "p95", "max"]
+
+
+class SelfSensor(Sensor):
+    """Reads the app's own fetch, payload and render metrics.
+
+    Without `metrics` every recorded histogram, optionally of a single `metric`, is a row of the configured
+    `statistics`. With `metrics` a single reading holds one statistic of each listed histogram, suited for sparklines.
+    """
+
+    def __init__(self, sensor_configuration: Dict[str, Any], context: Dict[str, Any]) -> None:
+        super().__init__()
+        self.name = sensor_configuration["name"]
+        self.metric = sensor_configuration.get("metric", None)
+        self.statistics = sensor_configuration.get("statistics", DEFAULT_STATISTICS)
+        self.metrics = sensor_configuration.get("metrics", None)
+
+    def get_sensor_fields(self) -> Iterable[RenderableType]:
+        if self.metrics is not None:
+            return [metric["name"] for metric in self.metrics]
+        return ["metric", "labels", *self.statistics]
+
+    def get_request_key(self) -> Hashable:
+        return ("self", self.name, self.metric, tuple(self.statistics), json.dumps(self.metrics, sort_keys=True))
+
+    def get_metric_labels(self) -> Dict[str, str]:
+        return {"sensor": self.name, "url": "self"}
+
+    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
+        if self.metrics is not None:
+            return [SensorReading([self.format_statistic(metrics.merge(metric["metric"], metric.get("labels", None)),
+                                                         metric.get("statistic", "p95"))
+                                   for metric in self.metrics])]
+        return [SensorReading([name, ",".join(f"{key}={value}" for key, value in labels),
+                               *[self.format_statistic(histogram, statistic) for statistic in self.statistics]],
+                              key=f"{name}{labels}")
+                for name, labels, histogram in metrics.find(self.metric)]
+
+    @staticmethod
+    def format_statistic(histogram: Histogram, statistic: str) -> str:
+        value = histogram.get_statistic(statistic)
+        return str(value) if isinstance(value, int) else f"{value:.4g}"
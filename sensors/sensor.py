@@ -1,15 +1,18 @@
 import json
+from abc import ABC, abstractmethod
 from string import Template
-from typing import Optional, Iterable, Dict, Any
+from typing import Optional, Iterable, Dict, Any, AsyncIterator, Hashable, List
 
 from rich.console import RenderableType
 
 
 class SensorReading:
-    def __init__(self, values: Iterable[RenderableType], details: Optional[RenderableType] = None) -> None:
+    def __init__(self, values: Iterable[RenderableType], details: Optional[RenderableType] = None,
+                 key: Optional[str] = None) -> None:
         super().__init__()
-        self.values = values
+        self.values = list(values)
         self.details = details
+        self.key = key
 
     def get_values(self) -> Iterable[RenderableType]:
         return self.values
@@ -17,14 +20,70 @@ class SensorReading:
     def get_details(self) -> Optional[RenderableType]:
         return self.details
 
+    def get_key(self) -> Optional[str]:
+        """Stable identity of the reading, e.g. a document id, used to recognise it across fetches."""
+        return self.key
 
-class Sensor:
+
+class Sensor(ABC):
     def get_sensor_fields(self) -> Iterable[RenderableType]:
         pass
 
     async def fetch_sensor_data(self) -> Iterable[SensorReading]:
         pass
 
+    def is_streaming(self) -> bool:
+        """Whether the sensor pushes its readings from stream_sensor_data rather than being polled."""
+        return False
+
+    async def stream_sensor_data(self) -> AsyncIterator[SensorReading]:
+        """Yield readings as the backend pushes them, the next one is only read once the previous one was taken."""
+        return
+        yield
+
+    async def fetch_sensor_history(self, start: float, end: float, step: float) -> Iterable[SensorReading]:
+        """Fetch readings between two unix timestamps, oldest first, for sensors able to query their history."""
+        return []
+
+    async def fetch_sensor_details(self, key: str) -> Optional[RenderableType]:
+        """Fetch the details of the reading with the given key when it is opened."""
+        return None
+
+    @abstractmethod
+    def get_request_key(self) -> Hashable:
+        """Identify the resolved request of the sensor, sensors sharing a key are only polled once.
+
+        The key is derived from the sensor's configuration, as it also identifies cached readings across sensors.
+        """
+
+    def get_metric_labels(self) -> Dict[str, str]:
+        """Labels of the metrics recorded for the sensor's fetches."""
+        return {}
+
+    def get_schedule_key(self) -> Hashable:
+        """Identify the group of sensors whose poll ticks are aligned, other groups tick at a random phase offset."""
+        return self.get_request_key()
+
+    def get_history_key(self) -> Optional[str]:
+        """Identify the sensor's readings in the history store across restarts, sensors without one are not stored."""
+        return None
+
+    def is_incremental(self) -> bool:
+        """Whether each fetch only returns readings newer than the previous ones rather than all current readings."""
+        return False
+
+    def get_max_readings(self) -> int:
+        """Readings of an incremental sensor kept across its fetches for subscriptions starting after them."""
+        return 1000
+
+    def get_high_water_mark(self) -> Optional[Any]:
+        """Json serializable position of the newest reading fetched, for sensors fetching incrementally."""
+        return None
+
+    def set_high_water_mark(self, high_water_mark: Any) -> None:
+        """Continue fetching after a stored high-water mark."""
+        pass
+
     @staticmethod
     def format(unformatted: Any, context: Dict[str, Any]):
         return Template(str(unformatted)).substitute(**context)
@@ -41,7 +100,9 @@ class Sensor:
 EMPTY_SENSOR_READING = SensorReading([])
 
 
+def encode_readings(readings: Iterable[SensorReading]) -> List[Dict[str, Any]]:
+    return [{"values": reading.values, "details": reading.details, "key": reading.key} for reading in readings]
 
 
-
-
+def decode_readings(readings: Iterable[Dict[str, Any]]) -> List[SensorReading]:
+    return [SensorReading(reading["values"], reading.get("details"), reading.get("key")) for reading in readings]
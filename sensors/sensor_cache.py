@@ -0,0 +1,45 @@
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+from sensors.sensor import SensorReading
+
+
+class CachedReadings:
+    def __init__(self, readings: List[SensorReading], fetched_at: float, high_water_mark: Optional[Any] = None) -> None:
+        super().__init__()
+        self.readings = readings
+        self.fetched_at = fetched_at
+        # position of an incremental sensor after the readings, at which fetches continue
+        self.high_water_mark = high_water_mark
+
+    def get_age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SensorCache:
+    """Last readings of every resolved sensor, kept for ttl_seconds after they were fetched."""
+
+    def __init__(self, ttl_seconds: float = 600) -> None:
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[Hashable, CachedReadings] = {}
+        self.pruned_at = time.time()
+
+    def get(self, key: Hashable) -> Optional[CachedReadings]:
+        entry = self.entries.get(key)
+        if entry is not None and entry.get_age_seconds() > self.ttl_seconds:
+            del self.entries[key]
+            return None
+        return entry
+
+    def put(self, key: Hashable, readings: List[SensorReading], fetched_at: float,
+            high_water_mark: Optional[Any] = None) -> None:
+        self.entries[key] = CachedReadings(readings, fetched_at, high_water_mark)
+        if time.time() - self.pruned_at > self.ttl_seconds:
+            self.prune()
+
+    def prune(self) -> None:
+        self.pruned_at = time.time()
+        for key, entry in list(self.entries.items()):
+            if entry.get_age_seconds() > self.ttl_seconds:
+                del self.entries[key]
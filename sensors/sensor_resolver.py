@@ -1,20 +1,44 @@
-from typing import Dict, Any
+import importlib
+import sys
+from typing import Dict, Any, Type
 
 from config.config import SensorConfig, SensorType
-from sensors.elastic.elastic_sensor import ElasticSensor
-from sensors.opensearch.opensearch_sensor import OpenSearchSensor
-from sensors.prometheus.prometheus_sensor import PrometheusSensor
 from sensors.sensor import Sensor
 
+# backends are imported the first time a sensor of their type is resolved
+SENSOR_CLASSES: Dict[SensorType, str] = {
+    SensorType.PROMETHEUS: "sensors.prometheus.prometheus_sensor.PrometheusSensor",
+    SensorType.ELASTIC: "sensors.elastic.elastic_sensor.ElasticSensor",
+    SensorType.OPEN_SEARCH: "sensors.opensearch.opensearch_sensor.OpenSearchSensor",
+    SensorType.SELF: "sensors.self.self_sensor.SelfSensor",
+    SensorType.SSE: "sensors.sse.sse_sensor.SseSensor",
+}
+
+sensor_classes: Dict[SensorType, Type[Sensor]] = {}
+
+
+def get_sensor_class(sensor_type: SensorType) -> Type[Sensor]:
+    if sensor_type not in sensor_classes:
+        if sensor_type not in SENSOR_CLASSES:
+            raise Exception(f"Unhandled sensor type: {sensor_type}")
+        module_name, class_name = SENSOR_CLASSES[sensor_type].rsplit(".", 1)
+        sensor_classes[sensor_type] = getattr(importlib.import_module(module_name), class_name)
+    return sensor_classes[sensor_type]
+
 
 def resolve_sensor(sensor_config: SensorConfig, context: Dict[str, Any]) -> Sensor:
     context = sensor_config.yaml_config.get("context", {}) | context
-    match sensor_config.get_sensor_type():
-        case SensorType.PROMETHEUS:
-            return PrometheusSensor(sensor_config.yaml_config, context)
-        case SensorType.ELASTIC:
-            return ElasticSensor(sensor_config.yaml_config, context)
-        case SensorType.OPEN_SEARCH:
-            return OpenSearchSensor(sensor_config.yaml_config, context)
-        case _:
-            Exception(f"Unhandled sensor type: {sensor_config.get_sensor_type()}")
+    return get_sensor_class(sensor_config.get_sensor_type())(sensor_config.yaml_config, context)
+
+
+async def close_sensor_clients() -> None:
+    """Close the connection pools shared by all sensors of each loaded backend."""
+    for sensor_class in list(sensor_classes.values()):
+        clients = getattr(sys.modules[sensor_class.__module__], "clients", {})
+        for client in list(clients.values()):
+            await client.close()
+        clients.clear()
+    if "sensors.search.search_batcher" in sys.modules:
+        sys.modules["sensors.search.search_batcher"].batchers.clear()
+    if "sensors.prometheus.query_folder" in sys.modules:
+        sys.modules["sensors.prometheus.query_folder"].folders.clear()
@@ -0,0 +1,64 @@
+from typing import AsyncIterator, Dict, NamedTuple, Optional
+
+import aiohttp
+
+
+class SseClientException(Exception):
+    pass
+
+
+class ServerSentEvent(NamedTuple):
+    """An event, its id is only set when the event carried one, servers resume after the last id of the stream."""
+    event: str
+    data: str
+    id: Optional[str]
+
+
+class AsyncSseClient:
+    """Minimal asyncio client reading server-sent event streams of one url, the connection is held open while read."""
+
+    def __init__(self, url: str, connect_timeout_seconds: float = 30) -> None:
+        super().__init__()
+        self.url = url
+        # streams may be idle for any time, only connecting is timed out
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout_seconds)
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the session, it must be bound to the running event loop."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False), timeout=self.timeout)
+        return self.session
+
+    async def events(self, headers: Dict[str, str], last_event_id: Optional[str] = None) \
+            -> AsyncIterator[ServerSentEvent]:
+        """Yield the events of the stream as they arrive, resuming after the last event id if the server supports it."""
+        headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"} | headers
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = last_event_id
+        async with self.get_session().get(self.url, headers=headers) as response:
+            if response.status != 200:
+                raise SseClientException(f"HTTP Status Code {response.status}")
+            event, data, event_id = "", [], None
+            async for line in response.content:
+                line = line.decode("utf-8", "replace").rstrip("\r\n")
+                if not line:
+                    # a blank line dispatches the event
+                    if data:
+                        yield ServerSentEvent(event or "message", "\n".join(data), event_id)
+                    event, data, event_id = "", [], None
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                match field:
+                    case "event":
+                        event = value
+                    case "data":
+                        data.append(value)
+                    case "id" if "\0" not in value:
+                        event_id = value
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Hashable, Iterable, Optional
+
+import aiohttp
+from rich.console import RenderableType
+
+from config.config import SensorConfig
+from sensors.sensor import Sensor, SensorReading
+from sensors.sse.sse_client import AsyncSseClient, ServerSentEvent, SseClientException
+
+clients: dict[str, AsyncSseClient] = {}
+
+
+class SseSensor(Sensor):
+    """Streams a server-sent events endpoint, every event is a reading of the `result_fields` of its json data.
+
+    Events whose data is not a json object are a reading of the raw data. Events are keyed by their id, a stream is
+    reopened from the id of the last event received, so servers keeping their events can continue where it ended.
+    """
+
+    def __init__(self, sensor_configuration: Dict[str, Any], context: Dict[str, Any]) -> None:
+        super().__init__()
+        self.url = self.format(sensor_configuration["url"], context)
+        self.name = sensor_configuration["name"]
+        if self.url not in clients:
+            clients[self.url] = AsyncSseClient(self.url)
+        self.client = clients[self.url]
+        self.headers = self.format_json(sensor_configuration.get("headers", {}), context)
+        self.events = sensor_configuration.get("events", None)
+        self.result_fields = sensor_configuration.get("result_fields", ["data"])
+        self.max_rows = SensorConfig(sensor_configuration).get_max_rows()
+        self.last_event_id: Optional[str] = None
+
+    def get_sensor_fields(self) -> Iterable[RenderableType]:
+        return self.result_fields
+
+    def get_metric_labels(self) -> Dict[str, str]:
+        return {"sensor": self.name, "url": self.url}
+
+    def get_request_key(self) -> Hashable:
+        return ("sse", self.url, json.dumps(self.headers, sort_keys=True), json.dumps(self.events),
+                tuple(self.result_fields))
+
+    def get_history_key(self) -> Optional[str]:
+        return repr(self.get_request_key())
+
+    def is_streaming(self) -> bool:
+        return True
+
+    def is_incremental(self) -> bool:
+        return True
+
+    def get_max_readings(self) -> int:
+        return self.max_rows
+
+    def get_high_water_mark(self) -> Optional[Any]:
+        return self.last_event_id
+
+    def set_high_water_mark(self, high_water_mark: Any) -> None:
+        if self.last_event_id is None:
+            self.last_event_id = high_water_mark
+
+    async def stream_sensor_data(self) -> AsyncIterator[SensorReading]:
+        try:
+            async for event in self.client.events(self.headers, self.last_event_id):
+                if event.id is not None:
+                    self.last_event_id = event.id
+                if self.events is None or event.event in self.events:
+                    yield self.to_reading(event)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, SseClientException) as stream_exception:
+            yield SensorReading([str(type(stream_exception).__name__)])
+
+    def to_reading(self, event: ServerSentEvent) -> SensorReading:
+        try:
+            data = json.loads(event.data)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return SensorReading([event.data], key=event.id)
+        return SensorReading([str(data.get(field, "N/A")) for field in self.result_fields], data, event.id)
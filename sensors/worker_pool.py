@@ -0,0 +1,43 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# responses at least this large are decoded by the pool rather than on the event loop
+OFFLOAD_BYTES = 2 ** 16
+
+T = TypeVar("T")
+
+executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="monitor-tui-worker")
+
+
+def loads(payload: str | bytes) -> Any:
+    """Decode json with orjson where it is installed."""
+    return orjson.loads(payload) if orjson is not None else json.loads(payload)
+
+
+class RawResponse:
+    """Body of a large response, decoded later by the pool instead of by the client on the event loop."""
+
+    def __init__(self, payload: str | bytes, decoder: Callable[[str | bytes], Any] = loads) -> None:
+        super().__init__()
+        self.payload = payload
+        self.decoder = decoder
+
+    def decode(self) -> Any:
+        return self.decoder(self.payload)
+
+
+def is_offloaded(payload: str | bytes) -> bool:
+    return len(payload) >= OFFLOAD_BYTES
+
+
+async def run_in_pool(function: Callable[..., T], *args: Any) -> T:
+    """Run cpu bound work on the bounded worker pool, keeping the event loop free to handle input and render."""
+    return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
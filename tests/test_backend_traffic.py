@@ -0,0 +1,50 @@
+import asyncio
+import gzip
+import json
+import time
+
+from sensors.backend_traffic import NO_RECORDED_RESPONSE, TrafficRecorder, TrafficReplayer
+
+
+def record_query(recorder: TrafficRecorder, value: str, at: float) -> None:
+    payload = json.dumps({"status": "success", "data": {"result": value}})
+    recorder.record("http://prometheus", "prometheus", {"endpoint": "query", "params": {"query": "up", "time": at}},
+                    payload.encode(), 200, 0.01)
+
+
+def test_recording_is_flushed_before_it_is_closed(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    recorder = TrafficRecorder(path, flush_interval_seconds=0.01)
+    record_query(recorder, "1", 1)
+    time.sleep(0.2)
+
+    # a copy of the file as left by a crash of the recording app
+    crashed = tmp_path / "crashed.jsonl.gz"
+    crashed.write_bytes(open(path, "rb").read())
+    recorder.close()
+
+    replayer = TrafficReplayer(str(crashed), original_timing=False)
+    payload, status = asyncio.run(replayer.replay_query("http://prometheus", {"endpoint": "query",
+                                                                             "params": {"query": "up", "time": 5}}))
+    assert status == 200 and json.loads(payload)["data"]["result"] == "1"
+
+
+def test_queries_are_replayed_in_recorded_order_regardless_of_time(tmp_path):
+    path = str(tmp_path / "traffic.jsonl.gz")
+    recorder = TrafficRecorder(path)
+    for i in range(3):
+        record_query(recorder, str(i), i)
+    recorder.close()
+    with gzip.open(path, "rt") as file:
+        assert len(file.readlines()) == 3
+
+    async def replay():
+        replayer = TrafficReplayer(path, original_timing=False)
+        request = {"endpoint": "query", "params": {"query": "up", "time": 100}}
+        results = [json.loads((await replayer.replay_query("http://prometheus", request))[0]) for _ in range(4)]
+        missing = await replayer.replay_query("http://prometheus", {"endpoint": "query", "params": {"query": "down"}})
+        return [result["data"]["result"] for result in results], missing
+
+    results, missing = asyncio.run(replay())
+    assert results == ["0", "1", "2", "2"]
+    assert json.loads(missing[0])["error"] == NO_RECORDED_RESPONSE and missing[1] == 404
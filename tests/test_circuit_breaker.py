@@ -0,0 +1,94 @@
+import asyncio
+
+import elasticsearch.exceptions
+import opensearchpy.exceptions
+import pytest
+
+from sensors.circuit_breaker import CircuitBreaker, CircuitOpenException
+from sensors.elastic.elastic_sensor import ElasticSensor
+from sensors.opensearch.opensearch_sensor import OpenSearchSensor
+from sensors.prometheus.prometheus_client import PrometheusClientException, PrometheusServerException, \
+    is_server_failure
+
+
+def call(breaker: CircuitBreaker, exception: Exception = None) -> str:
+    async def request() -> str:
+        if exception is not None:
+            raise exception
+        return "ok"
+
+    try:
+        return asyncio.run(breaker.call(request, lambda failure: isinstance(failure, ConnectionError)))
+    except Exception as call_exception:
+        return type(call_exception).__name__
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3)
+    assert [call(breaker, ConnectionError()) for _ in range(3)] == ["ConnectionError"] * 3
+    assert breaker.get_state() == "open"
+    assert call(breaker) == "CircuitOpenException"
+
+
+def test_success_resets_the_failures():
+    breaker = CircuitBreaker(failure_threshold=3)
+    call(breaker, ConnectionError())
+    call(breaker, ConnectionError())
+    call(breaker)
+    call(breaker, ConnectionError())
+    assert breaker.get_state() == "closed"
+
+
+def test_exceptions_other_than_failures_do_not_open_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=3)
+    assert [call(breaker, ValueError()) for _ in range(5)] == ["ValueError"] * 5
+    assert breaker.get_state() == "closed"
+
+
+def test_half_open_circuit_lets_a_single_probe_in():
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff_seconds=0)
+    call(breaker, ConnectionError())
+    assert breaker.get_state() == "half_open"
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.get_state() == "closed"
+
+
+def test_backoff_doubles_up_to_its_maximum():
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff_seconds=10, max_backoff_seconds=30)
+    backoffs = []
+    for _ in range(4):
+        breaker.record_failure()
+        backoffs.append(breaker.backoff_seconds)
+    assert 5 <= backoffs[0] <= 10
+    assert 10 <= backoffs[1] <= 20
+    assert all(15 <= backoff <= 30 for backoff in backoffs[2:])
+
+
+@pytest.mark.parametrize("sensor_class, exceptions", [
+    (ElasticSensor, elasticsearch.exceptions),
+    (OpenSearchSensor, opensearchpy.exceptions),
+])
+def test_only_cluster_failures_count_for_searches(sensor_class, exceptions):
+    assert sensor_class.is_cluster_failure(exceptions.ConnectionError("N/A", "refused", None))
+    assert sensor_class.is_cluster_failure(exceptions.ConnectionTimeout("TIMEOUT", "timed out", None))
+    assert sensor_class.is_cluster_failure(asyncio.TimeoutError())
+    assert sensor_class.is_cluster_failure(exceptions.TransportError(503, "unavailable", {}))
+    assert not sensor_class.is_cluster_failure(exceptions.RequestError(400, "parsing_exception", {}))
+    assert not sensor_class.is_cluster_failure(exceptions.NotFoundError(404, "index_not_found_exception", {}))
+    assert not sensor_class.is_cluster_failure(exceptions.SerializationError("invalid json"))
+    assert not sensor_class.is_cluster_failure(ValueError())
+
+
+def test_only_server_failures_count_for_prometheus():
+    assert is_server_failure(PrometheusServerException("HTTP Status Code 503"))
+    assert is_server_failure(asyncio.TimeoutError())
+    assert not is_server_failure(PrometheusClientException("HTTP Status Code 400"))
+
+
+def test_open_circuit_exception_names_its_state():
+    breaker = CircuitBreaker(failure_threshold=1)
+    call(breaker, ConnectionError())
+    with pytest.raises(CircuitOpenException, match="circuit open, 1 consecutive failures"):
+        asyncio.run(breaker.call(lambda: asyncio.sleep(0), lambda failure: True))
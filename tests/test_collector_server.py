@@ -0,0 +1,43 @@
+import asyncio
+import os
+import stat
+from typing import Any, Dict
+
+from config.config import Config
+from sensors.collector.collector_protocol import LINE_LIMIT, decode_message, encode_message
+from sensors.collector.collector_server import Collector
+from sensors.polling_engine import PollingEngine
+from sensors.sensor_cache import SensorCache
+
+SENSOR = {"sensor_type": "self", "name": "fetches", "metric": "sensor_fetch_seconds"}
+CONFIG = Config({"services": [{"name": "monitor-tui", "context": {"env": "test"}, "sensors": [SENSOR]}]})
+
+
+async def subscribe(socket_path: str, sensor: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=LINE_LIMIT)
+    writer.write(encode_message({"type": "subscribe", "id": 1, "sensor": sensor, "context": context,
+                                 "poll_wait_seconds": 60}))
+    message = decode_message(await asyncio.wait_for(reader.readline(), 5))
+    writer.close()
+    return message
+
+
+def test_collector_only_polls_its_configured_sensors(tmp_path):
+    socket_path = str(tmp_path / "collector.sock")
+
+    async def run() -> None:
+        serving = asyncio.create_task(Collector(PollingEngine(SensorCache()), socket_path, CONFIG).serve())
+        while not os.path.exists(socket_path):
+            await asyncio.sleep(0.01)
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+        configured = await subscribe(socket_path, SENSOR, {"env": "test"})
+        assert "not configured" not in str(configured["readings"])
+
+        foreign = SENSOR | {"sensor_type": "prometheus", "url": "http://attacker.example", "metrics": []}
+        for sensor, context in [(foreign, {"env": "test"}), (SENSOR, {"env": "other"})]:
+            rejected = await subscribe(socket_path, sensor, context)
+            assert rejected["readings"][0]["values"] == ["sensor fetches is not configured at the collector"]
+        serving.cancel()
+
+    asyncio.run(run())
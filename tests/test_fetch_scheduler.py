@@ -0,0 +1,90 @@
+import asyncio
+from typing import List
+
+from sensors.fetch_scheduler import PRIORITY_BACKGROUND, PRIORITY_SELECTED, PRIORITY_VISIBLE, FetchScheduler, \
+    current_priority, prioritized
+
+
+async def request(scheduler: FetchScheduler, url: str, name: str, priority: int, started: List[str],
+                  release: asyncio.Event) -> None:
+    async with scheduler.slot(url, priority):
+        started.append(name)
+        await release.wait()
+
+
+def test_requests_beyond_the_limit_wait_for_a_slot():
+    async def run() -> None:
+        scheduler = FetchScheduler(max_concurrent_requests=2)
+        started, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(request(scheduler, "a", str(i), PRIORITY_BACKGROUND, started, release))
+                 for i in range(3)]
+        other = asyncio.create_task(request(scheduler, "b", "b", PRIORITY_BACKGROUND, started, release))
+        await asyncio.sleep(0.01)
+        assert started == ["0", "1", "b"]
+        release.set()
+        await asyncio.gather(*tasks, other)
+        assert started == ["0", "1", "b", "2"]
+        assert scheduler.in_flight == {} and scheduler.waiting == {}
+
+    asyncio.run(run())
+
+
+def test_waiting_requests_are_let_in_by_priority_then_arrival():
+    async def run() -> None:
+        scheduler = FetchScheduler(max_concurrent_requests=1)
+        started, releases = [], [asyncio.Event() for _ in range(5)]
+        priorities = [PRIORITY_BACKGROUND, PRIORITY_BACKGROUND, PRIORITY_SELECTED, PRIORITY_VISIBLE, PRIORITY_SELECTED]
+        tasks = []
+        for i, priority in enumerate(priorities):
+            tasks.append(asyncio.create_task(request(scheduler, "a", str(i), priority, started, releases[i])))
+            await asyncio.sleep(0)
+        for i in [0, 3, 2, 4]:
+            releases[i].set()
+            await asyncio.sleep(0.01)
+        releases[1].set()
+        await asyncio.gather(*tasks)
+        assert started == ["0", "3", "2", "4", "1"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiting_requests_give_up_their_turn():
+    async def run() -> None:
+        scheduler = FetchScheduler(max_concurrent_requests=1)
+        started, release = [], asyncio.Event()
+        first = asyncio.create_task(request(scheduler, "a", "first", PRIORITY_BACKGROUND, started, release))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(request(scheduler, "a", "cancelled", PRIORITY_VISIBLE, started, release))
+        last = asyncio.create_task(request(scheduler, "a", "last", PRIORITY_BACKGROUND, started, release))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        await asyncio.gather(first, last)
+        assert started == ["first", "last"]
+        assert scheduler.in_flight == {}
+
+    asyncio.run(run())
+
+
+async def hold(scheduler: FetchScheduler, url: str) -> None:
+    async with scheduler.slot(url):
+        pass
+
+
+def test_slots_default_to_the_priority_of_the_current_task():
+    async def run() -> int:
+        scheduler = FetchScheduler(max_concurrent_requests=1)
+        started, release = [], asyncio.Event()
+        blocking = asyncio.create_task(request(scheduler, "a", "blocking", PRIORITY_BACKGROUND, started, release))
+        await asyncio.sleep(0)
+        with prioritized(PRIORITY_VISIBLE):
+            # tasks started meanwhile inherit the priority
+            waiting = asyncio.create_task(hold(scheduler, "a"))
+        await asyncio.sleep(0)
+        priority = scheduler.waiting["a"][0][0]
+        release.set()
+        await asyncio.gather(blocking, waiting)
+        return priority
+
+    assert asyncio.run(run()) == PRIORITY_VISIBLE
+    assert current_priority.get() == PRIORITY_BACKGROUND
@@ -0,0 +1,50 @@
+import time
+
+from sensors.history_store import HistoryStore
+from sensors.sensor import SensorReading
+
+
+def test_written_readings_are_read_back(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite"))
+    store.put("sensor", [SensorReading(["1"], key="a")], 10, {"position": 1})
+    store.put("sensor", [SensorReading(["2"], key="b")], 20, {"position": 2})
+    store.flush()
+
+    assert [(fetched_at, [reading.values for reading in readings])
+            for fetched_at, readings in store.get_since("sensor", 15)] == [(20, [["2"]])]
+    fetched_at, readings = store.get_latest("sensor")
+    assert fetched_at == 20 and readings[0].get_key() == "b"
+    assert store.get_high_water_mark("sensor") == {"position": 2}
+    store.close()
+
+
+def test_queued_readings_are_written_on_close(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(path)
+    now = time.time()
+    for i in range(100):
+        store.put("sensor", [SensorReading([str(i)])], now + i)
+    store.close()
+
+    store = HistoryStore(path)
+    assert len(store.get_since("sensor", 0)) == 100
+    store.close()
+
+
+def test_old_and_excess_rows_are_pruned_by_the_writer(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    store = HistoryStore(path, max_age_seconds=60, max_rows=2)
+    now = time.time()
+    store.put("expired", [SensorReading(["old"])], now - 120, "mark")
+    for i in range(4):
+        store.put("sensor", [SensorReading([str(i)])], now + i)
+    store.close()
+
+    store = HistoryStore(path, max_age_seconds=60, max_rows=2)
+    # the writer prunes when it starts, before its first write
+    store.put("other", [], now)
+    store.flush()
+    assert [readings[0].values for _, readings in store.get_since("sensor", 0)] == [["2"], ["3"]]
+    assert store.get_since("expired", 0) == []
+    assert store.get_high_water_mark("expired") is None
+    store.close()
@@ -0,0 +1,26 @@
+import json
+
+import elasticsearch.exceptions
+import opensearchpy
+import pytest
+
+from sensors.elastic.elastic_sensor import ElasticSerializer
+from sensors.opensearch.opensearch_sensor import OpenSearchSerializer
+from sensors.worker_pool import OFFLOAD_BYTES, RawResponse
+
+
+@pytest.mark.parametrize("serializer_class, serialization_error", [
+    (ElasticSerializer, elasticsearch.exceptions.SerializationError),
+    (OpenSearchSerializer, opensearchpy.SerializationError),
+])
+def test_large_responses_are_left_to_the_pool(serializer_class, serialization_error):
+    serializer = serializer_class("http://localhost:9200")
+    assert serializer.loads('{"took": 1}') == {"took": 1}
+
+    large = json.dumps({"message": "x" * OFFLOAD_BYTES})
+    response = serializer.loads(large)
+    assert isinstance(response, RawResponse)
+    assert response.decode() == json.loads(large)
+
+    with pytest.raises(serialization_error):
+        serializer.loads("<html>" + "x" * OFFLOAD_BYTES).decode()
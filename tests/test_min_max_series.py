@@ -0,0 +1,64 @@
+import random
+from typing import Dict, List
+
+import pytest
+
+from sensors.min_max_series import MinMaxSeries
+
+
+def downsample(values: List[float], first_index: int, bucket_size: int, width: int) -> List[float]:
+    """Min/max bucketing of the values by their absolute index, recomputed from scratch."""
+    buckets: Dict[int, List[float]] = {}
+    for offset, value in enumerate(values):
+        buckets.setdefault((first_index + offset) // bucket_size, []).append(value)
+    cells = []
+    for bucket in sorted(buckets):
+        bucket_values = buckets[bucket]
+        if len(bucket_values) == 1:
+            cells.append(bucket_values[0])
+            continue
+        minimum, maximum = min(bucket_values), max(bucket_values)
+        in_order = bucket_values.index(minimum) <= bucket_values.index(maximum)
+        cells.extend((minimum, maximum) if in_order else (maximum, minimum))
+    return cells[-width:] if width > 0 else cells
+
+
+@pytest.mark.parametrize("capacity, width, count", [(60, 0, 40), (60, 20, 60), (100, 10, 250), (7, 3, 30)])
+def test_series_matches_bucketing_of_all_appended_values(capacity, width, count):
+    generator = random.Random(count)
+    values = [generator.uniform(-10, 10) for _ in range(count)]
+    series = MinMaxSeries(capacity, width)
+    for value in values:
+        series.append(value)
+    first_index = count - min(count, capacity)
+    # the oldest bucket keeps the values dropped from the history since the bucket started
+    first_bucket_index = first_index // series.bucket_size * series.bucket_size
+    assert series.to_array().tolist() == downsample(values[first_bucket_index:], first_bucket_index,
+                                                    series.bucket_size, width)
+    assert len(series) == min(count, capacity)
+
+
+def test_resized_series_is_bucketed_from_its_history():
+    values = [float(value) for value in range(50)]
+    series = MinMaxSeries(30, 10)
+    for value in values:
+        series.append(value)
+    series.resize(6)
+    assert series.bucket_size == 10
+    assert series.to_array().tolist() == downsample(values[20:], 20, 10, 6)
+
+
+def test_spikes_within_a_bucket_are_kept_in_order():
+    series = MinMaxSeries(4, 2)
+    for value in [1, 9, 0, 2]:
+        series.append(value)
+    assert series.bucket_size == 4
+    assert series.to_array().tolist() == [9, 0]
+
+
+def test_cleared_series_is_empty():
+    series = MinMaxSeries(10, 4)
+    series.append(1)
+    series.clear()
+    assert series.to_array().tolist() == []
+    assert len(series) == 0
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Iterable, List
+
+from sensors.polling_engine import PollingEngine
+from sensors.sensor import Sensor, SensorReading
+from sensors.sensor_cache import SensorCache
+
+
+class FailingSensor(Sensor):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def get_request_key(self):
+        return "failing"
+
+    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("unexpected")
+        return [SensorReading(["ok"])]
+
+
+def test_failed_fetch_is_published_and_polling_continues():
+    async def run() -> List[List[str]]:
+        engine = PollingEngine(SensorCache())
+        delivered = []
+        subscription = engine.subscribe(FailingSensor(1), 60, lambda readings, _: delivered.append(readings))
+        job = subscription.job
+        await asyncio.sleep(0.01)
+        assert not job.task.done()
+        await job.fetch()
+        engine.close()
+        return [[str(value) for value in readings[0].values] for readings in delivered]
+
+    assert asyncio.run(run()) == [["RuntimeError"], ["ok"]]
+
+
+def test_reschedule_restarts_finished_poll():
+    async def run() -> None:
+        engine = PollingEngine(SensorCache())
+        subscription = engine.subscribe(FailingSensor(0), 60, lambda readings, _: None)
+        job = subscription.job
+        job.task.cancel()
+        await asyncio.sleep(0)
+        assert job.task.done()
+        job.reschedule()
+        assert not job.task.done()
+        engine.close()
+
+    asyncio.run(run())
+
+
+class CountingSensor(Sensor):
+    """Fetches one new reading after the previous ones on every fetch."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.position = 0
+
+    def get_request_key(self):
+        return "counting"
+
+    def is_incremental(self) -> bool:
+        return True
+
+    def get_max_readings(self) -> int:
+        return 3
+
+    def get_high_water_mark(self):
+        return self.position
+
+    def set_high_water_mark(self, high_water_mark) -> None:
+        self.position = high_water_mark
+
+    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
+        self.position += 1
+        return [SensorReading([str(self.position)])]
+
+
+def values(readings: List[SensorReading]) -> List[str]:
+    return [reading.values[0] for reading in readings]
+
+
+def test_incremental_readings_are_kept_for_later_subscriptions():
+    async def run() -> None:
+        engine = PollingEngine(SensorCache())
+        first, second = [], []
+        subscription = engine.subscribe(CountingSensor(), 60, lambda readings, _: first.append(values(readings)))
+        job = subscription.job
+        await job.start_fetch()
+        subscription.pause()
+        for _ in range(3):
+            await job.fetch()
+        engine.subscribe(CountingSensor(), 60, lambda readings, _: second.append(values(readings)))
+        subscription.resume()
+        engine.close()
+
+        assert first == [["1"], ["2", "3", "4"]]
+        assert second == [["2", "3", "4"]]
+
+        # a job started anew from the cache continues after its readings
+        sensor = CountingSensor()
+        engine.subscribe(sensor, 60, lambda readings, _: None)
+        assert sensor.position == 4
+        engine.close()
+
+    asyncio.run(run())
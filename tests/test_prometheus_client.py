@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from sensors.prometheus.prometheus_client import AsyncPrometheusClient, PrometheusClientException
+
+
+async def serve(response: web.Response) -> web.AppRunner:
+    async def handler(request: web.Request) -> web.Response:
+        return response
+
+    app = web.Application()
+    app.router.add_route("*", "/api/v1/query", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+def get_url(runner: web.AppRunner) -> str:
+    host, port = runner.addresses[0][:2]
+    return f"http://{host}:{port}"
+
+
+@pytest.mark.parametrize("status, body", [(404, "<html>Not Found</html>"), (200, "<html>Sign in</html>"),
+                                          (200, "[1, 2]")])
+def test_non_json_response_raises_client_exception(status: int, body: str):
+    async def run() -> None:
+        runner = await serve(web.Response(status=status, text=body, content_type="text/html"))
+        client = AsyncPrometheusClient(get_url(runner))
+        try:
+            with pytest.raises(PrometheusClientException, match=f"HTTP Status Code {status}: invalid response"):
+                await client.custom_query("up")
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_json_response_returns_result():
+    async def run() -> None:
+        runner = await serve(web.json_response(
+            {"status": "success", "data": {"result": [{"metric": {}, "value": [0, "1"]}]}}))
+        client = AsyncPrometheusClient(get_url(runner))
+        try:
+            assert await client.custom_query("up") == [{"metric": {}, "value": [0, "1"]}]
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
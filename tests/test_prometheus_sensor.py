@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, Dict, List
+
+from sensors.prometheus.prometheus_sensor import PrometheusSensor
+
+
+class FakeRangeClient:
+    def __init__(self, series: Dict[str, List[Any]]) -> None:
+        super().__init__()
+        self.series = series
+
+    async def custom_query_range(self, query: str, start: float, end: float, step: float) -> List[Dict[str, Any]]:
+        values = self.series[query]
+        return [{"metric": {}, "values": values}] if values else []
+
+
+def fetch_history(series: Dict[str, List[Any]]) -> List[List[Any]]:
+    sensor = PrometheusSensor({"url": "http://prometheus", "name": "history",
+                               "metrics": [{"name": query, "query": query} for query in series]}, {})
+    sensor.client = FakeRangeClient(series)
+    return [reading.values for reading in asyncio.run(sensor.fetch_sensor_history(0, 30, 10))]
+
+
+def test_history_is_aligned_on_the_timestamps_of_every_metric():
+    assert fetch_history({"a": [[0, "1"], [10, "2"], [20, "3"]], "b": [[10, "5"], [30, "6"]]}) == \
+           [["1", None], ["2", "5"], ["3", None], [None, "6"]]
+
+
+def test_history_of_a_metric_with_an_empty_range_keeps_the_others():
+    assert fetch_history({"a": [[0, "1"], [10, "2"]], "b": []}) == [["1", None], ["2", None]]
+
+
+def test_history_without_metrics_is_empty():
+    assert fetch_history({}) == []
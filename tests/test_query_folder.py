@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Dict, List
+
+from sensors.prometheus.prometheus_client import PrometheusClientException
+from sensors.prometheus.query_folder import QueryFolder, get_fold
+
+
+class FakePrometheusClient:
+    """Answers a query per instance with one series, and rejects folded queries if asked to."""
+
+    def __init__(self, reject_folded: bool = False) -> None:
+        super().__init__()
+        self.reject_folded = reject_folded
+        self.queries: List[str] = []
+
+    async def custom_query(self, query: str) -> List[Dict[str, Any]]:
+        self.queries.append(query)
+        if "=~" in query:
+            if self.reject_folded:
+                raise PrometheusClientException("HTTP Status Code 422: many-to-many matching not allowed")
+            instances = query.split('instance=~"')[1].split('"')[0].split("|")
+        else:
+            instances = [query.split('instance="')[1].split('"')[0]]
+        return [{"metric": {"instance": instance}, "value": [0, instance]} for instance in instances]
+
+
+def test_fold_of_label_matcher():
+    assert get_fold('up{instance="$label"}') == ("instance", "label")
+    assert get_fold('rate(requests_total{job="api", instance="${label}"}[5m])') == ("instance", "label")
+    assert get_fold('sum by (instance) (rate(requests_total{instance="$label"}[5m]))') == ("instance", "label")
+
+
+def test_no_fold_of_templates_depending_on_other_series():
+    assert get_fold('absent(up{instance="$label"})') is None
+    assert get_fold('absent_over_time(up{instance="$label"}[5m])') is None
+    assert get_fold('up{instance="$label"} or vector(0)') is None
+    assert get_fold('up{instance="$label"} unless down{instance="$label"}') is None
+    assert get_fold('up{instance="$label"} and on(job) ready') is None
+    assert get_fold('up{instance="$label"} * ignoring(job) ready{instance="$label"}') is None
+    assert get_fold('a{instance="$label"} * on(instance) group_left(version) info') is None
+
+
+def test_no_fold_of_other_templates():
+    assert get_fold('up{instance="$label", job="$job"}') is None
+    assert get_fold('up{instance=~"$label"}') is None
+    assert get_fold('sum(up{instance="$label"})') is None
+    assert get_fold('up') is None
+
+
+def test_folded_queries_are_split_by_label():
+    async def run() -> List[Any]:
+        client = FakePrometheusClient()
+        folder = QueryFolder(client, 0)
+        template = 'up{instance="$label"}'
+        results = await asyncio.gather(*[folder.query(template, "instance", "label", value) for value in "ab"])
+        assert client.queries == ['up{instance=~"a|b"}']
+        return results
+
+    assert asyncio.run(run()) == [[{"metric": {"instance": "a"}, "value": [0, "a"]}],
+                                  [{"metric": {"instance": "b"}, "value": [0, "b"]}]]
+
+
+def test_failed_folded_query_falls_back_to_a_query_per_value():
+    async def run() -> None:
+        client = FakePrometheusClient(reject_folded=True)
+        folder = QueryFolder(client, 0)
+        template = 'up{instance="$label"}'
+        results = await asyncio.gather(*[folder.query(template, "instance", "label", value) for value in "ab"])
+        assert [result[0]["value"][1] for result in results] == ["a", "b"]
+        assert (template, "instance", "label") in folder.unfoldable
+
+        client.queries.clear()
+        await asyncio.gather(*[folder.query(template, "instance", "label", value) for value in "ab"])
+        assert sorted(client.queries) == ['up{instance="a"}', 'up{instance="b"}']
+
+    asyncio.run(run())
+
+
+def test_cancelled_flush_fails_its_queries():
+    async def run() -> List[Any]:
+        folder = QueryFolder(FakePrometheusClient(), 1)
+        template = 'up{instance="$label"}'
+        queries = asyncio.gather(*[folder.query(template, "instance", "label", value) for value in "ab"],
+                                 return_exceptions=True)
+        await asyncio.sleep(0)
+        folder.flush_task.cancel()
+        results = await asyncio.wait_for(queries, 1)
+        assert folder.flush_task is None and not folder.pending
+        return results
+
+    assert [str(result) for result in asyncio.run(run())] == ["query cancelled", "query cancelled"]
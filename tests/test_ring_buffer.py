@@ -0,0 +1,30 @@
+from sensors.ring_buffer import RingBuffer
+
+
+def test_values_are_kept_oldest_first():
+    buffer = RingBuffer(3)
+    buffer.extend([1, 2])
+    assert buffer.to_list() == [1, 2]
+    assert len(buffer) == 2
+
+
+def test_full_buffer_overwrites_its_oldest_values():
+    buffer = RingBuffer(3)
+    buffer.extend(range(7))
+    assert buffer.to_list() == [4, 5, 6]
+    assert len(buffer) == 3
+
+
+def test_cleared_buffer_is_empty():
+    buffer = RingBuffer(3)
+    buffer.extend(range(5))
+    buffer.clear()
+    assert buffer.to_list() == []
+    buffer.append(9)
+    assert buffer.to_list() == [9]
+
+
+def test_capacity_is_at_least_one():
+    buffer = RingBuffer(0)
+    buffer.extend([1, 2])
+    assert buffer.to_list() == [2]
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from sensors.circuit_breaker import breakers
+from sensors.search.search_batcher import SearchBatcher, SearchResponseError
+
+
+class FakeSearchClient:
+    """Answers every search of an _msearch with its index, or fails searches of the index "missing"."""
+
+    def __init__(self, delay_seconds: float = 0) -> None:
+        super().__init__()
+        self.delay_seconds = delay_seconds
+        self.requests: List[List[Dict[str, Any]]] = []
+
+    async def msearch(self, body: List[Dict[str, Any]], **params: Any) -> Dict[str, Any]:
+        self.requests.append(body)
+        await asyncio.sleep(self.delay_seconds)
+        return {"responses": [{"error": {"type": "index_not_found_exception"}} if header["index"] == "missing"
+                              else {"hits": {"hits": [{"_id": header["index"]}]}} for header in body[::2]]}
+
+
+@pytest.fixture(autouse=True)
+def clear_breakers():
+    yield
+    breakers.clear()
+
+
+def test_concurrent_searches_are_sent_as_one_msearch():
+    async def run() -> List[Any]:
+        client = FakeSearchClient()
+        batcher = SearchBatcher(client, "http://search", lambda failure: True, window_seconds=0.01)
+        results = await asyncio.gather(
+            batcher.search("a", {}),
+            batcher.search("b", {}, lambda response: response["hits"]["hits"][0]["_id"].upper()),
+            batcher.search("missing", {}),
+            return_exceptions=True)
+        assert len(client.requests) == 1
+        return results
+
+    first, second, missing = asyncio.run(run())
+    assert first == {"hits": {"hits": [{"_id": "a"}]}}
+    assert second == "B"
+    assert isinstance(missing, SearchResponseError) and missing.error_type == "index_not_found_exception"
+
+
+@pytest.mark.parametrize("cancel_after_seconds", [0, 0.01, 0.1])
+def test_cancelled_flush_fails_its_searches(cancel_after_seconds):
+    """Cancelled before it started, within the batch window or while the _msearch is in flight."""
+    async def run() -> List[Any]:
+        client = FakeSearchClient(delay_seconds=1)
+        batcher = SearchBatcher(client, "http://search", lambda failure: True, window_seconds=0.05)
+        searches = asyncio.gather(batcher.search("a", {}), batcher.search("b", {}), return_exceptions=True)
+        await asyncio.sleep(0)
+        flush_task = batcher.flush_task
+        if cancel_after_seconds:
+            await asyncio.sleep(cancel_after_seconds)
+        assert len(client.requests) == (cancel_after_seconds > batcher.window_seconds)
+        flush_task.cancel()
+        results = await asyncio.wait_for(searches, 1)
+        assert batcher.flush_task is None and not batcher.pending
+        return results
+
+    results = asyncio.run(run())
+    assert [result.error_type for result in results] == ["search_cancelled", "search_cancelled"]
@@ -0,0 +1,47 @@
+from typing import Any, Dict, List
+
+from sensors.elastic.elastic_sensor import ElasticSensor
+
+SENSOR_CONFIGURATION = {
+    "url": "http://localhost:9200",
+    "name": "tail",
+    "index_pattern": "logs-*",
+    "query": {"match_all": {}},
+    "max_hits": 10,
+    "sort": {"@timestamp": "desc"},
+    "tail": True,
+    "result_fields": ["message"],
+}
+
+
+def hit(id: str, sort: Any) -> Dict[str, Any]:
+    return {"_id": id, "_source": {"message": id}, "sort": [sort]}
+
+
+def read_keys(sensor: ElasticSensor, hits: List[Dict[str, Any]]) -> List[str]:
+    tail = sensor.tail_position, sensor.tail_ids
+    readings, (sensor.tail_position, sensor.tail_ids) = sensor.read_hits({"hits": {"hits": hits}}, tail)
+    return [reading.get_key() for reading in readings]
+
+
+def test_tail_skips_null_sort_values():
+    sensor = ElasticSensor(SENSOR_CONFIGURATION, {})
+    assert read_keys(sensor, [hit("b", 2), hit("missing", None), hit("a", 1)]) == ["b", "missing", "a"]
+    assert sensor.tail_position == 2
+    assert sensor.tail_ids == {"b"}
+
+
+def test_tail_skips_sort_values_of_another_type():
+    sensor = ElasticSensor(SENSOR_CONFIGURATION, {})
+    read_keys(sensor, [hit("a", 1)])
+    assert set(read_keys(sensor, [hit("a", 1), hit("text", "x"), hit("b", 2.5)])) == {"text", "b"}
+    assert sensor.tail_position == 2.5
+    assert sensor.tail_ids == {"b"}
+
+
+def test_reading_hits_leaves_the_tail_state_of_the_sensor():
+    sensor = ElasticSensor(SENSOR_CONFIGURATION, {})
+    readings, tail = sensor.read_hits({"hits": {"hits": [hit("b", 2), hit("a", 1)]}}, (None, set()))
+    assert [reading.get_key() for reading in readings] == ["b", "a"]
+    assert tail == (2, {"b"})
+    assert sensor.tail_position is None and sensor.tail_ids == set()
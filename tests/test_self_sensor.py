@@ -0,0 +1,7 @@
+from sensors.self.self_sensor import SelfSensor
+
+
+def test_request_key_is_derived_from_configuration():
+    configuration = {"name": "latency", "metrics": [{"name": "fetch p95", "metric": "sensor_fetch_seconds"}]}
+    assert SelfSensor(configuration, {}).get_request_key() == SelfSensor(dict(configuration), {}).get_request_key()
+    assert SelfSensor(configuration, {}).get_request_key() != SelfSensor({"name": "latency"}, {}).get_request_key()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable
+
+from rich.text import Text
+from textual.app import App, ComposeResult
+from textual.widgets import Static
+
+import components.sensor.sensor_content
+from components.sensor.sensor_content import SensorContent
+from config.config import SensorConfig
+from sensors.polling_engine import PollingEngine
+from sensors.sensor import Sensor, SensorReading
+from sensors.sensor_cache import SensorCache
+
+
+class OnceSensor(Sensor):
+    """Answers its first fetch, later fetches never complete."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fetches = 0
+
+    def get_sensor_fields(self) -> Iterable[str]:
+        return ["value"]
+
+    def get_request_key(self):
+        return "once"
+
+    async def fetch_sensor_data(self) -> Iterable[SensorReading]:
+        self.fetches += 1
+        if self.fetches > 1:
+            await asyncio.Event().wait()
+        return [SensorReading(["1"])]
+
+
+class OnceEngine(PollingEngine):
+    def resolve_sensor(self, sensor_config: SensorConfig, context: Dict[str, Any]) -> Sensor:
+        return OnceSensor()
+
+
+class ContentApp(App):
+    def __init__(self, engine: PollingEngine) -> None:
+        super().__init__()
+        self.engine = engine
+
+    def compose(self) -> ComposeResult:
+        yield SensorContent(SensorConfig({"name": "value", "sensor_type": "prometheus", "poll_wait_seconds": 30}), {},
+                            self.engine)
+
+
+def test_resumed_sensor_is_marked_stale_without_a_new_fetch(monkeypatch):
+    async def run() -> None:
+        engine = OnceEngine(SensorCache())
+        app = ContentApp(engine)
+        async with app.run_test() as pilot:
+            content = app.query_one(SensorContent)
+            await pilot.pause(0.1)
+            title = content.query_one(".sensor-title", Static)
+            assert "stale" not in str(title.renderable)
+
+            content.show(False)
+            later = time.time() + 60
+            monkeypatch.setattr(components.sensor.sensor_content, "time", SimpleNamespace(time=lambda: later))
+            content.show(True)
+            await pilot.pause()
+
+            assert isinstance(title.renderable, Text)
+            assert "stale" in str(title.renderable)
+            assert content.has_class("-stale")
+        engine.close()
+
+    asyncio.run(run())
@@ -0,0 +1,76 @@
+import asyncio
+from typing import List
+
+from textual.app import App, ComposeResult
+from textual.widgets import DataTable
+
+from components.sensor.sensor_table import SensorTable
+from sensors.sensor import SensorReading
+
+
+class TableApp(App):
+    def compose(self) -> ComposeResult:
+        yield SensorTable("logs", ["message"], complete_refresh=True, max_rows=10)
+
+
+def readings(keys: List[str]) -> List[SensorReading]:
+    return [SensorReading([f"message {key}"], key=key) for key in keys]
+
+
+def row_keys(table: DataTable) -> List[str]:
+    return [row.key.value for row in table.ordered_rows]
+
+
+def test_new_row_on_top_keeps_rows_and_cursor():
+    async def run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            sensor_table = app.query_one(SensorTable)
+            table = app.query_one(DataTable)
+            sensor_table.update_data(readings(["c", "b", "a"]))
+            await pilot.pause()
+            table.move_cursor(row=1)
+            kept_rows = {key: table.rows[key] for key in table.rows}
+            cleared = []
+            table.clear = lambda *args, **kwargs: cleared.append(True)
+
+            sensor_table.update_data(readings(["e", "d", "c", "b"]))
+            await pilot.pause()
+
+            assert row_keys(table) == ["e", "d", "c", "b"]
+            assert [str(table.get_row_at(i)[0]) for i in range(table.row_count)] == \
+                   ["message e", "message d", "message c", "message b"]
+            assert row_keys(table)[table.cursor_row] == "b"
+            assert all(table.rows[key] is row for key, row in kept_rows.items() if key in table.rows)
+            assert not cleared
+
+    asyncio.run(run())
+
+
+def test_reordered_rows_follow_readings():
+    async def run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            sensor_table = app.query_one(SensorTable)
+            table = app.query_one(DataTable)
+            sensor_table.update_data(readings(["a", "b", "c"]))
+            sensor_table.update_data(readings(["c", "a", "d"]))
+            await pilot.pause()
+            assert row_keys(table) == ["c", "a", "d"]
+
+    asyncio.run(run())
+
+
+def test_rows_of_identical_values_are_reordered():
+    async def run() -> None:
+        app = TableApp()
+        async with app.run_test() as pilot:
+            sensor_table = app.query_one(SensorTable)
+            table = app.query_one(DataTable)
+            same = [SensorReading(["same"], key=key) for key in ["x", "y"]]
+            sensor_table.update_data(same + readings(["a"]))
+            sensor_table.update_data(readings(["b", "a"]) + same)
+            await pilot.pause()
+            assert row_keys(table) == ["b", "a", "x", "y"]
+
+    asyncio.run(run())
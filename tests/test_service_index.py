@@ -0,0 +1,50 @@
+from typing import List
+
+from components.service.service_index import ServiceIndex
+from config.config import ServiceConfig
+
+SERVICES = [
+    ServiceConfig({"name": "billing-api", "hierarchy": "payments/backend", "context": {"instance": "billing:8080"}}),
+    ServiceConfig({"name": "api-gateway", "hierarchy": "edge", "context": {"instance": "gateway:443"}}),
+    ServiceConfig({"name": "invoices", "hierarchy": "payments/backend", "context": {"instance": "invoices:8080"}}),
+    ServiceConfig({"name": "search", "hierarchy": "catalog", "context": {"cluster": "es-api"}}),
+    ServiceConfig({"name": "ui", "hierarchy": "edge"}),
+]
+
+
+def names(services: List[ServiceConfig]) -> List[str]:
+    return [service.get_name() for service in services]
+
+
+def test_matches_contain_every_term_in_their_name_hierarchy_or_context():
+    index = ServiceIndex(SERVICES)
+    assert names(index.search("payments 8080")[0]) == ["billing-api", "invoices"]
+    assert names(index.search("EDGE")[0]) == ["api-gateway", "ui"]
+    assert index.search("unknown") == ([], 0)
+
+
+def test_names_starting_with_then_containing_the_first_term_come_first():
+    services, total = ServiceIndex(SERVICES).search("api")
+    assert names(services) == ["api-gateway", "billing-api", "search"]
+    assert total == 3
+
+
+def test_extended_queries_narrow_the_previous_matches():
+    index = ServiceIndex(SERVICES)
+    for query in ["i", "in", "inv", "invo", "inv"]:
+        expected = [service for service in SERVICES if all(
+            term in " ".join([service.get_name(), "/".join(service.get_hierarchy()),
+                              *map(str, service.get_context().values())]).lower() for term in query.split())]
+        assert sorted(names(index.search(query)[0])) == sorted(names(expected))
+
+
+def test_empty_query_matches_nothing():
+    index = ServiceIndex(SERVICES)
+    assert index.search("  ") == ([], 0)
+    assert names(index.search("ui")[0]) == ["ui"]
+
+
+def test_limit_keeps_the_best_matches_and_the_total():
+    services, total = ServiceIndex(SERVICES).search("a", limit=2)
+    assert names(services) == ["api-gateway", "billing-api"]
+    assert total == 4